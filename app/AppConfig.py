@@ -10,3 +10,18 @@ class AppConfig:
         self.stream_url = AppConfig.DEFAULT_VIDEO_URL
         self.box_width = 0.4
         self.box_height = 0.6
+        self.packer_name = 'Skyline'
+        self.allow_rotation = True
+        self.multi_bin = True
+        self.online_packing = True
+        # Физическая укладка: подбирать ориентации коробок параллельными симуляциями вместо поворота по одной
+        self.orientation_search = True
+        # Детекция в отдельном процессе (кадры через разделяемую память), чтобы инференс не тормозил окно
+        self.detection_in_process = True
+        # Сторона входа сети детекции (320/480/640, кратна 32); None — во всю ширину кадра
+        self.inference_size = 640
+        # Где искать коробки: "markers" — в области, охватывающей маркеры ArUco; (x, y, w, h) в пикселях кадра;
+        # None — во всём кадре
+        self.detection_roi = "markers"
+        # Куда дописывать размеры зафиксированных коробок для бенчмарка упаковщиков (None — не писать)
+        self.sizes_record_path = None
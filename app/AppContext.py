@@ -11,4 +11,7 @@ class AppContext:
         self.ui_manager: UIManager = ui_manager
         self.screen_manager: ScreenManager = screen_manager
         self.config = AppConfig()
-        self.camera_controller: CameraController = CameraController(self.config.stream_url)
+        self.camera_controller: CameraController = CameraController(self.config.stream_url,
+                                                                    self.config.detection_in_process,
+                                                                    self.config.inference_size,
+                                                                    self.config.detection_roi)
@@ -0,0 +1,51 @@
+import json
+import os
+
+import numpy as np
+
+DISTRIBUTIONS = ('uniform', 'skewed', 'recorded')
+
+MIN_SIZE = 30
+MAX_SIZE = 100
+
+
+def generate_sizes(count: int, distribution: str = 'uniform', rng: np.random.Generator | None = None,
+                   recorded: np.ndarray | None = None, min_size: int = MIN_SIZE, max_size: int = MAX_SIZE) -> np.ndarray:
+    """
+    Генерирует размеры коробок.
+
+    :param distribution: 'uniform' — равномерно в [min_size, max_size];
+                         'skewed' — в основном мелкие, изредка крупные (бета-распределение);
+                         'recorded' — выборка с возвращением из записанных с камеры размеров
+    :param recorded: массив (N, 2) записанных размеров, нужен для 'recorded'
+    :return: массив (count, 2) целых (w, h)
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    if distribution == 'uniform':
+        return rng.integers(min_size, max_size, size=(count, 2), endpoint=True)
+
+    if distribution == 'skewed':
+        sizes = min_size + (max_size - min_size) * rng.beta(1.2, 4.0, size=(count, 2))
+        return np.rint(sizes).astype(np.int64)
+
+    if distribution == 'recorded':
+        if recorded is None or len(recorded) == 0:
+            raise ValueError("Для распределения 'recorded' нужны записанные размеры")
+        return np.asarray(recorded, dtype=np.int64)[rng.integers(0, len(recorded), size=count)]
+
+    raise ValueError(f"Неизвестное распределение: {distribution}")
+
+
+def load_recorded_sizes(path: str) -> np.ndarray:
+    with open(path, encoding='utf-8') as f:
+        return np.array(json.load(f), dtype=np.int64).reshape(-1, 2)
+
+
+def record_sizes(path: str, sizes):
+    """Дописывает размеры обнаруженных коробок в JSON-файл (список [w, h])."""
+    recorded = load_recorded_sizes(path).tolist() if os.path.exists(path) else []
+    recorded.extend([int(w), int(h)] for w, h in sizes)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(recorded, f)
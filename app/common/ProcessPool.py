@@ -0,0 +1,40 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+_executor: ProcessPoolExecutor | None = None
+_lock = threading.Lock()
+_workers = os.cpu_count() or 1
+# Задачи прогрева, уже отправленные в пул
+_warmed = set()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Общий пул процессов для тяжёлых расчётов (портфель упаковщиков, перебор ориентаций).
+    Поднимать процессы на каждое нажатие слишком дорого, поэтому пул создаётся один раз.
+    Процессы запускаются через spawn, а не fork: к этому моменту в процессе уже работают pygame
+    и потоки захвата и обработки кадров, копировать их в дочерний процесс нельзя.
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(_workers, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def warm_up_process_pool(task):
+    """
+    Заранее поднимает процессы пула: через spawn каждый стартует с нуля и заново импортирует модули,
+    и при первом нажатии на это уходил бы весь бюджет времени. Задача — функция без аргументов
+    на уровне модуля; её распаковка в дочернем процессе импортирует этот модуль.
+    Одна и та же задача отправляется только один раз.
+    """
+    executor = get_process_pool()
+    with _lock:
+        if task in _warmed:
+            return
+        _warmed.add(task)
+    for _ in range(_workers):
+        executor.submit(task)
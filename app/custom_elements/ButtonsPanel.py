@@ -17,7 +17,15 @@ class ButtonsPanel:
             manager=ui_manager)
         self.place_button = elements.UIButton(
             relative_rect=self.create_button_rect(),
-            text='Разместить NFDH',
+            text='Разместить',
+            manager=ui_manager)
+        self.packer_button = elements.UIButton(
+            relative_rect=self.create_button_rect(),
+            text='',
+            manager=ui_manager)
+        self.bin_button = elements.UIButton(
+            relative_rect=self.create_button_rect(),
+            text='',
             manager=ui_manager)
         self.place_phys_button = elements.UIButton(
             relative_rect=self.create_button_rect(),
@@ -41,16 +49,18 @@ class ButtonsPanel:
 
     def update_layout(self):
         button_panel_x = self.rect.x
-        button_panel_y = self.rect.height // 2 - 80
+        button_panel_y = self.rect.height // 2 - 200
 
         offset = 60
 
         self.gen_button.set_relative_position((button_panel_x, button_panel_y))
         self.place_button.set_relative_position((button_panel_x, button_panel_y + offset))
-        self.place_phys_button.set_relative_position((button_panel_x, button_panel_y + offset * 2))
-        self.camera_button.set_relative_position((button_panel_x, button_panel_y + offset * 3))
-        self.process_button.set_relative_position((button_panel_x, button_panel_y + offset * 4))
-        self.fix_cam_button.set_relative_position((button_panel_x, button_panel_y + offset * 5))
+        self.packer_button.set_relative_position((button_panel_x, button_panel_y + offset * 2))
+        self.bin_button.set_relative_position((button_panel_x, button_panel_y + offset * 3))
+        self.place_phys_button.set_relative_position((button_panel_x, button_panel_y + offset * 4))
+        self.camera_button.set_relative_position((button_panel_x, button_panel_y + offset * 5))
+        self.process_button.set_relative_position((button_panel_x, button_panel_y + offset * 6))
+        self.fix_cam_button.set_relative_position((button_panel_x, button_panel_y + offset * 7))
 
     def draw(self, surface: pygame.surface):
         self.ui_manager.draw_ui(surface)
@@ -8,10 +8,14 @@ class DrawableRect:
     _id_counter = 0
 
     def __init__(self, rect: pygame.Rect, angle: float = 0, image=None,
-                 back_color: Tuple[int, int, int] = None, rect_id=None):
+                 back_color: Tuple[int, int, int] = None, rect_id=None, rotated: bool = False):
         self.rect: pygame.Rect = rect
         self.angle = angle
         self.image = image
+        # Упаковщик повернул элемент на 90°: rect уже в новой ориентации, image — в исходной
+        self.rotated = rotated
+        # Номер ящика при упаковке в несколько ящиков
+        self.bin_index = 0
         if back_color is None:
             back_color = [randint(0, 255) for _ in range(3)]
         self.back_color = back_color
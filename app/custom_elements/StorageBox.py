@@ -16,6 +16,14 @@ class StorageBox:
         self.border_width = 2
 
         self.placeables: List[DrawableRect] = []
+        self.bin_index = 0
+
+    @property
+    def bin_count(self):
+        return max((item.bin_index for item in self.placeables), default=0) + 1
+
+    def next_bin(self):
+        self.bin_index = (self.bin_index + 1) % self.bin_count
 
     def update_rect(self, rect: pygame.Rect):
         self.rect = rect
@@ -28,8 +36,12 @@ class StorageBox:
         self.subsurface.fill(self.fill_color)
 
         for item in self.placeables:
+            if item.bin_index != self.bin_index:
+                continue
             if item.image is not None:
                 sprite = pygame.surfarray.make_surface(item.image)
+                if item.rotated:
+                    sprite = pygame.transform.rotate(sprite, 90)
                 self.subsurface.blit(sprite, item.rect.topleft)
             else:
                 self.subsurface.fill(item.back_color, item.rect)
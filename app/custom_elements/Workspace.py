@@ -1,4 +1,3 @@
-import random
 from typing import List
 
 import cv2
@@ -9,6 +8,7 @@ from pygame.display import update
 from pygame.examples.testsprite import update_rects
 
 from app.common import Colors
+from app.common.ItemGenerator import generate_sizes
 from app.custom_elements.DrawableRect import DrawableRect
 from camera.detectors.ArucoDetector import ArucoResult
 
@@ -44,12 +44,12 @@ class Workspace:
         self.camera_width = width
         self._recalculate_scale_ratio()
 
-    def create_random_items(self, count: int):
-        for i in range(count):
-            width, height = random.randint(30, 100), random.randint(30, 100)
-            x_pos = random.randint(0, self.rect.width - width)
-            y_pos = random.randint(0, self.rect.height - height)
-            color = random.choice(Colors.RECTANGLE_COLORS)
+    def create_random_items(self, count: int, distribution: str = 'uniform', seed=None, recorded=None):
+        rng = np.random.default_rng(seed)
+        for width, height in generate_sizes(count, distribution, rng, recorded).tolist():
+            x_pos = int(rng.integers(0, max(0, self.rect.width - width), endpoint=True))
+            y_pos = int(rng.integers(0, max(0, self.rect.height - height), endpoint=True))
+            color = Colors.RECTANGLE_COLORS[rng.integers(len(Colors.RECTANGLE_COLORS))]
 
             self.generated_boxes.append(DrawableRect(pygame.Rect(x_pos, y_pos, width, height), back_color=color))
 
@@ -0,0 +1,125 @@
+import math
+import random
+import time
+from typing import List
+
+from app.custom_elements.DrawableRect import DrawableRect
+from app.packers.PackerBase import PackerBase, Item, Placement
+from app.packers.SkylinePacker import SkylinePacker
+
+
+class AnnealingPacker(PackerBase):
+    """
+    Имитация отжига по порядку укладки и ориентации элементов; каждое решение раскладывается
+    быстрым движком (по умолчанию Skyline). Работает до time_budget секунд и отдаёт в on_complete
+    каждое улучшение: первое размещение приходит сразу, дальше оно улучшается на месте.
+    """
+
+    # Не чаще, чем раз в REPORT_INTERVAL секунд, отправляем улучшения в интерфейс
+    REPORT_INTERVAL = 0.1
+
+    def __init__(self, bin_width: int, bin_height: int, allow_rotation: bool = False, time_budget: float = 2.0,
+                 engine: type[PackerBase] = SkylinePacker, seed=None):
+        super().__init__(bin_width, bin_height, allow_rotation)
+        self.time_budget = time_budget
+        self.decoder = engine(bin_width, bin_height, allow_rotation)
+        self.sort_key = self.decoder.sort_key
+        self.normalize_upright = self.decoder.normalize_upright
+        self.random = random.Random(seed)
+
+    def pack(self, source_rects: List[DrawableRect], on_complete):
+        items = [(r.rect_id, r.rect.width, r.rect.height) for r in source_rects]
+
+        for placements in self.improve(items):
+            if self.cancelled:
+                return
+            self.result = self.to_drawable(placements, source_rects)
+            on_complete(self.result)
+
+    def place(self, items: List[Item]) -> List[Placement]:
+        best = []
+        for best in self.improve(items):
+            pass
+        return best
+
+    def improve(self, items: List[Item]):
+        """Генератор всё более плотных размещений."""
+        deadline = time.monotonic() + self.time_budget
+        if not items:
+            yield []
+            return
+
+        # Стартуем с жадного решения движка; ориентации, выбранные им, становятся начальными генами
+        _, flips, order = self.prepare_items(items)
+        index_by_id = {rect_id: i for i, (rect_id, _, _) in enumerate(items)}
+        for placement in self.decoder.place(items):
+            flips[index_by_id[placement[0]]] = placement[5]
+
+        current, current_area = self.decode(items, order, flips)
+        best, best_area = current, current_area
+        yield best
+
+        total_area = sum(width * height for _, width, height in items)
+        start_temperature = 0.3 * total_area / len(items)
+        budget_start = time.monotonic()
+        last_report = budget_start
+        unreported = False
+
+        while not self.cancelled and best_area < total_area:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+
+            new_order, new_flips = self._neighbour(order, flips)
+            placements, area = self.decode(items, new_order, new_flips)
+
+            progress = (now - budget_start) / max(deadline - budget_start, 1e-9)
+            temperature = start_temperature * (1 - progress) + 1e-9
+            delta = area - current_area
+            if delta >= 0 or self.random.random() < math.exp(delta / temperature):
+                order, flips, current_area = new_order, new_flips, area
+                if area > best_area:
+                    best, best_area = placements, area
+                    unreported = True
+
+            if unreported and now - last_report >= self.REPORT_INTERVAL:
+                yield best
+                last_report, unreported = now, False
+
+        if unreported:
+            yield best
+
+    def decode(self, items: List[Item], order: List[int], flips: List[bool]):
+        packing_bin = self.decoder.create_bin()
+        placements = []
+        area = 0
+        for i in order:
+            rect_id, width, height = items[i]
+            if flips[i]:
+                width, height = height, width
+            position = packing_bin.insert(width, height)
+            if position is None:
+                continue
+            x, y, width, height, _ = position
+            placements.append((rect_id, x, y, width, height, flips[i]))
+            area += width * height
+        return placements, area
+
+    def _neighbour(self, order: List[int], flips: List[bool]):
+        order, flips = list(order), list(flips)
+        count = len(order)
+        move = self.random.random()
+
+        if self.allow_rotation and move < 0.3:
+            i = self.random.randrange(count)
+            flips[i] = not flips[i]
+        elif move < 0.8:
+            i, j = self.random.randrange(count), self.random.randrange(count)
+            order[i], order[j] = order[j], order[i]
+        else:
+            # Переносим элемент ближе к началу: так в решение попадают невлезшие элементы
+            i = self.random.randrange(count)
+            j = self.random.randrange(i + 1)
+            order.insert(j, order.pop(i))
+
+        return order, flips
@@ -0,0 +1,276 @@
+import time
+from typing import List
+
+from app.custom_elements.DrawableRect import DrawableRect
+from app.packers.MaxRectsPacker import MaxRectsPacker
+from app.packers.PackerBase import PackerBase, Item, Placement
+
+
+class _Timeout(Exception):
+    pass
+
+
+class ExactPacker(PackerBase):
+    """
+    Ветвления и границ в классе skyline-размещений для малых наборов: максимизирует уложенную площадь.
+    Элемент всегда кладётся в левый край самого низкого сегмента skyline, либо сегмент "закрывается"
+    (поднимается до соседа). Одинаковые по размеру элементы не различаются, подзадачи
+    (skyline, оставшиеся элементы) запоминаются вместе с границами, ветви отсекаются по лучшему
+    найденному решению (начиная с MaxRects) и площадной верхней границе за вычетом заведомо пустых впадин.
+
+    Это решатель "с любым временем", а не гарантированно точный: на плотных наборах из 10–20 элементов
+    площадная граница слаба, и доказать оптимальность за time_budget обычно не удаётся (optimal=False).
+    Тогда возвращается лучшее найденное, не хуже MaxRects, и этот результат кэшируется как есть:
+    иначе каждое нажатие заново тратило бы весь бюджет. Доминирование по skyline пробовалось
+    и не окупило своих сравнений.
+    С fallback (упаковщик нескольких ящиков) точный результат берётся, только если уложено всё,
+    иначе упаковка отдаётся fallback: молча терять коробки нельзя.
+    """
+
+    MAX_ITEMS = 20
+
+    def __init__(self, bin_width: int, bin_height: int, allow_rotation: bool = False, time_budget: float = 0.5,
+                 fallback: PackerBase | None = None):
+        super().__init__(bin_width, bin_height, allow_rotation)
+        self.time_budget = time_budget
+        self.fallback = fallback
+
+        self.nodes = 0
+        self.optimal = False
+
+    def pack(self, source_rects: List[DrawableRect], on_complete):
+        if self.fallback is None:
+            super().pack(source_rects, on_complete)
+            return
+
+        items = [(r.rect_id, r.rect.width, r.rect.height) for r in source_rects]
+        placements = self.place_cached(items, self.place)
+        if self.cancelled:
+            return
+        if len(placements) < len(items):
+            self.fallback.pack(source_rects, on_complete)
+            return
+
+        self.result = self.to_drawable(placements, source_rects)
+        on_complete(self.result)
+
+    def cancel(self):
+        super().cancel()
+        if self.fallback is not None:
+            self.fallback.cancel()
+
+    def place(self, items: List[Item]) -> List[Placement]:
+        greedy = MaxRectsPacker(self.bin_width, self.bin_height, self.allow_rotation).place(items)
+        greedy_area = sum(p[3] * p[4] for p in greedy)
+        if len(items) > self.MAX_ITEMS:
+            self.optimal = False
+            return greedy
+
+        self._prepare_types(items)
+        self._memo = {}
+        # Лучшее найденное решение: (площадь, ходы). MaxRects даёт начальную нижнюю границу для отсечения;
+        # skyline-решение, не лучше его, не нужно — тогда и вернётся greedy
+        self._incumbent = (greedy_area, None)
+        self._deadline = time.monotonic() + self.time_budget
+        self.nodes = 0
+
+        root = ((self.bin_width, 0),)
+        counts = tuple(len(ids) for ids in self._type_items)
+        self._root_bound = self._upper_bound(root, counts)
+        try:
+            self._solve(root, counts, 0, [])
+            self.optimal = True
+        except _Timeout:
+            self.optimal = False
+
+        moves = self._incumbent[1]
+        if moves is None:
+            return greedy
+        return self._replay(root, moves)
+
+    def _prepare_types(self, items: List[Item]):
+        # Типы элементов: при поворотах (30, 60) и (60, 30) — один тип
+        types = {}
+        for rect_id, width, height in items:
+            key = (min(width, height), max(width, height)) if self.allow_rotation else (width, height)
+            types.setdefault(key, []).append((rect_id, width, height))
+
+        # Крупные типы первыми: раньше находится хорошее решение, сильнее отсечение
+        keys = sorted(types, key=lambda k: k[0] * k[1], reverse=True)
+        self._type_sizes = keys
+        self._type_items = [types[k] for k in keys]
+
+    def _orientations(self, type_index):
+        width, height = self._type_sizes[type_index]
+        if self.allow_rotation and width != height:
+            return (width, height), (height, width)
+        return (width, height),
+
+    def _upper_bound(self, skyline, counts):
+        free_area = self.bin_width * self.bin_height - sum(w * h for w, h in skyline)
+        lowest = min(h for _, h in skyline)
+        room = self.bin_height - lowest
+
+        remaining = 0
+        narrowest = self.bin_width + 1
+        for type_index, count in enumerate(counts):
+            if not count:
+                continue
+            fitting = [w for w, h in self._orientations(type_index) if w <= self.bin_width and h <= room]
+            if fitting:
+                width, height = self._type_sizes[type_index]
+                remaining += count * width * height
+                narrowest = min(narrowest, min(fitting))
+
+        # Впадина уже самого узкого оставшегося элемента не заполнится ничем: её площадь до нижнего
+        # из соседей (стенка — бесконечно высокий сосед) потеряна при любом продолжении
+        wasted = 0
+        for i, (width, height) in enumerate(skyline):
+            if width >= narrowest:
+                continue
+            left = skyline[i - 1][1] if i > 0 else self.bin_height
+            right = skyline[i + 1][1] if i + 1 < len(skyline) else self.bin_height
+            if left > height and right > height:
+                wasted += width * (min(left, right) - height)
+        return min(remaining, free_area - wasted)
+
+    def _moves(self, skyline, counts):
+        index = min(range(len(skyline)), key=lambda i: skyline[i][1])
+        segment_width, segment_height = skyline[index]
+
+        moves = []
+        for type_index, count in enumerate(counts):
+            if not count:
+                continue
+            for width, height in self._orientations(type_index):
+                if width <= segment_width and segment_height + height <= self.bin_height:
+                    moves.append((type_index, width, height))
+
+        # Закрыть сегмент: поднять его до ближайшего соседа (или до верха, если соседей нет)
+        neighbours = [skyline[i][1] for i in (index - 1, index + 1) if 0 <= i < len(skyline)]
+        moves.append((None, segment_width, (min(neighbours) if neighbours else self.bin_height) - segment_height))
+        return index, moves
+
+    @staticmethod
+    def _apply(skyline, index, width, height):
+        segment_width, segment_height = skyline[index]
+        replaced = [(width, segment_height + height)]
+        if width < segment_width:
+            replaced.append((segment_width - width, segment_height))
+
+        merged = []
+        for segment in skyline[:index] + tuple(replaced) + skyline[index + 1:]:
+            if merged and merged[-1][1] == segment[1]:
+                merged[-1] = (merged[-1][0] + segment[0], segment[1])
+            else:
+                merged.append(segment)
+        return tuple(merged)
+
+    def _solve(self, skyline, counts, placed_area, path):
+        """
+        Верхняя граница площади, которую ещё можно уложить из этого состояния; точное значение,
+        если подзадача решена полностью (флаг в memo). Ветви, которые даже по границе не превзойдут
+        лучшее найденное решение (incumbent), отсекаются, а их граница запоминается: при повторном
+        заходе с другим префиксом она сразу отсекает подзадачу снова или сужает поиск.
+        """
+        key = (skyline, counts)
+        entry = self._memo.get(key)
+        if entry is not None:
+            bound, exact, _ = entry
+            if exact:
+                if placed_area + bound > self._incumbent[0]:
+                    self._incumbent = (placed_area + bound, path + self._best_moves(skyline, counts))
+                return bound
+            if placed_area + bound <= self._incumbent[0]:
+                return bound
+        else:
+            bound = self._upper_bound(skyline, counts) if min(h for _, h in skyline) < self.bin_height else 0
+
+        self.nodes += 1
+        if self.nodes % 1024 == 0 and time.monotonic() > self._deadline:
+            raise _Timeout()
+
+        if bound == 0:
+            if placed_area > self._incumbent[0]:
+                self._incumbent = (placed_area, list(path))
+            self._memo[key] = (0, True, None)
+            return 0
+        if placed_area + bound <= self._incumbent[0]:
+            self._memo[key] = (bound, False, None)
+            return bound
+
+        # best — лучшее достигнутое значение; pruned — наибольшая граница ветвей, решённых не до конца
+        best, best_move, pruned = 0, None, 0
+        index, moves = self._moves(skyline, counts)
+        for move in moves:
+            if self._incumbent[0] >= self._root_bound:
+                # Найдено решение на общей границе: лучше не бывает, дальше искать незачем
+                pruned = max(pruned, bound)
+                break
+
+            type_index, width, height = move
+            child = self._apply(skyline, index, width, height)
+            if type_index is None:
+                gain, child_counts = 0, counts
+            else:
+                gain = width * height
+                child_counts = counts[:type_index] + (counts[type_index] - 1,) + counts[type_index + 1:]
+
+            child_entry = self._memo.get((child, child_counts))
+            child_bound = gain + (child_entry[0] if child_entry is not None else self._upper_bound(child, child_counts))
+            if child_bound <= best:
+                continue
+            if placed_area + child_bound <= self._incumbent[0]:
+                pruned = max(pruned, child_bound)
+                continue
+
+            path.append(move)
+            value = gain + self._solve(child, child_counts, placed_area + gain, path)
+            path.pop()
+
+            if self._memo[(child, child_counts)][1]:
+                if value > best:
+                    best, best_move = value, move
+            else:
+                pruned = max(pruned, value)
+
+        if pruned <= best:
+            self._memo[key] = (best, True, best_move)
+            return best
+        bound = min(bound, pruned)
+        self._memo[key] = (bound, False, best_move)
+        return bound
+
+    def _best_moves(self, skyline, counts):
+        # Продолжение из точно решённой подзадачи: лучшие ходы точных узлов ведут в точные узлы
+        moves = []
+        while True:
+            move = self._memo[(skyline, counts)][2]
+            if move is None:
+                return moves
+            moves.append(move)
+            skyline, counts = self._step(skyline, counts, move)
+
+    def _step(self, skyline, counts, move):
+        type_index, width, height = move
+        index = min(range(len(skyline)), key=lambda i: skyline[i][1])
+        if type_index is not None:
+            counts = counts[:type_index] + (counts[type_index] - 1,) + counts[type_index + 1:]
+        return self._apply(skyline, index, width, height), counts
+
+    def _replay(self, skyline, moves) -> List[Placement]:
+        remaining = [list(items) for items in self._type_items]
+        placements = []
+
+        for move in moves:
+            type_index, width, height = move
+            index = min(range(len(skyline)), key=lambda i: skyline[i][1])
+            if type_index is not None:
+                x = sum(w for w, _ in skyline[:index])
+                y = skyline[index][1]
+                rect_id, original_width, original_height = remaining[type_index].pop()
+                rotated = (original_width, original_height) != (width, height)
+                placements.append((rect_id, x, y, width, height, rotated))
+            skyline = self._apply(skyline, index, width, height)
+
+        return placements
@@ -0,0 +1,62 @@
+from app.packers.PackerBase import PackerBase, SORT_KEYS
+
+
+class GuillotineBin:
+    """Guillotine: best-area-fit, разрез по более короткой оставшейся стороне."""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.free_rects = [(0, 0, width, height)]
+
+    def find_position(self, width: int, height: int, allow_rotation: bool = False):
+        orientations = [(width, height, False)]
+        if allow_rotation and width != height:
+            orientations.append((height, width, True))
+
+        best = None
+        best_area = None
+
+        for i, (fx, fy, fw, fh) in enumerate(self.free_rects):
+            area = fw * fh
+            if best is not None and area >= best_area:
+                continue
+            for w, h, rotated in orientations:
+                if w <= fw and h <= fh:
+                    best, best_area = (i, w, h, rotated), area
+                    break
+
+        return best
+
+    def insert(self, width: int, height: int, allow_rotation: bool = False):
+        best = self.find_position(width, height, allow_rotation)
+        if best is None:
+            return None
+
+        index, width, height, rotated = best
+        fx, fy, fw, fh = self.free_rects.pop(index)
+        self._split(fx, fy, fw, fh, width, height)
+        return fx, fy, width, height, rotated
+
+    def _split(self, fx, fy, fw, fh, width, height):
+        leftover_w, leftover_h = fw - width, fh - height
+
+        if leftover_w < leftover_h:
+            # Горизонтальный разрез: справа узкая полоса, снизу вся ширина
+            right = (fx + width, fy, leftover_w, height)
+            bottom = (fx, fy + height, fw, leftover_h)
+        else:
+            # Вертикальный разрез: справа вся высота, снизу узкая полоса
+            right = (fx + width, fy, leftover_w, fh)
+            bottom = (fx, fy + height, width, leftover_h)
+
+        for rect in (right, bottom):
+            if rect[2] > 0 and rect[3] > 0:
+                self.free_rects.append(rect)
+
+
+class GuillotinePacker(PackerBase):
+    sort_key = staticmethod(SORT_KEYS['area'])
+
+    def create_bin(self):
+        return GuillotineBin(self.bin_width, self.bin_height)
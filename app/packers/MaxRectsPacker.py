@@ -0,0 +1,190 @@
+from app.packers.PackerBase import PackerBase, SORT_KEYS
+
+
+class MaxRectsBin:
+    """
+    MaxRects, эвристика best-short-side-fit. Свободное место — список максимальных прямоугольников (x, y, w, h).
+    Занятые хранятся по id, а для удаления ещё и в сетке ячеек CELL_SIZE: так удаление находит
+    соседей освобождённого места, не перебирая все уложенные элементы.
+    """
+
+    # Порядка размера коробки: мельче — удаление дольше обходит кольца, крупнее — больше лишних соседей
+    CELL_SIZE = 128
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.free_rects = [(0, 0, width, height)]
+        self.used_rects = {}
+        # (столбец, строка) ячейки -> id занятых прямоугольников, её задевающих
+        self._cells = {}
+
+    def find_position(self, width: int, height: int, allow_rotation: bool = False):
+        orientations = [(width, height, False)]
+        if allow_rotation and width != height:
+            orientations.append((height, width, True))
+
+        best = None
+        best_score = None
+
+        for fx, fy, fw, fh in self.free_rects:
+            for w, h, rotated in orientations:
+                if w > fw or h > fh:
+                    continue
+                leftover_w, leftover_h = fw - w, fh - h
+                score = (min(leftover_w, leftover_h), max(leftover_w, leftover_h))
+                if best is None or score < best_score:
+                    best = (fx, fy, w, h, rotated)
+                    best_score = score
+
+        return best
+
+    def insert(self, width: int, height: int, allow_rotation: bool = False, rect_id=None):
+        """:param rect_id: ключ для remove; без него элемент удалить нельзя (обычная упаковка)"""
+        placed = self.find_position(width, height, allow_rotation)
+        if placed is None:
+            return None
+
+        self._split_free_rects(placed[:4])
+        # Учитываются все занятые, иначе remove посчитал бы свободным место под элементом без ключа
+        if rect_id is None:
+            rect_id = object()
+        self.used_rects[rect_id] = placed[:4]
+        for cell in self._cells_of(placed[:4]):
+            self._cells.setdefault(cell, set()).add(rect_id)
+        return placed
+
+    def remove(self, rect_id):
+        """
+        Освобождает ранее занятый прямоугольник (для онлайн-упаковки). Остальные элементы не двигаются.
+        Пересчитываются только максимальные свободные прямоугольники, задевающие освобождённое место:
+        остальные от удаления не меняются. Прежние свободные прямоугольники, вложенные в новые, выбрасываются.
+        """
+        freed = self.used_rects.pop(rect_id)
+        for cell in self._cells_of(freed):
+            self._cells[cell].discard(rect_id)
+
+        # Режем весь ящик занятыми прямоугольниками, но держим только куски, задевающие освобождённое место:
+        # кусок, его не задевающий, уже есть среди свободных (или вложен в один из них).
+        # Занятые берутся кольцами ячеек вокруг освобождённого места; как только куски не дотягиваются
+        # до следующего кольца, дальние занятые их уже не заденут
+        size = self.CELL_SIZE
+        left, top = freed[0] // size, freed[1] // size
+        right, bottom = (freed[0] + freed[2] - 1) // size, (freed[1] + freed[3] - 1) // size
+        last_column, last_row = (self.width - 1) // size, (self.height - 1) // size
+
+        grown = [(0, 0, self.width, self.height)]
+        cut = set()
+        ring = 0
+        while True:
+            block = (left - ring, top - ring, right + ring, bottom + ring)
+            for cell in self._ring(*block):
+                for used_id in self._cells.get(cell, ()):
+                    if used_id in cut:
+                        continue
+                    cut.add(used_id)
+                    untouched, split = self._split(grown, self.used_rects[used_id])
+                    if split:
+                        split = [rect for rect in split if self._intersects(rect, freed)]
+                        grown = untouched + self._prune(split, untouched)
+
+            if block[0] <= 0 and block[1] <= 0 and block[2] >= last_column and block[3] >= last_row:
+                break
+            reach = self._bounds(grown)
+            if (block[0] <= reach[0] // size and block[1] <= reach[1] // size
+                    and (reach[0] + reach[2] - 1) // size <= block[2] and (reach[1] + reach[3] - 1) // size <= block[3]):
+                break
+            ring += 1
+
+        # Вложенными в новые куски могут быть только свободные прямоугольники внутри их общей рамки
+        reach = self._bounds(grown)
+        kept = [rect for rect in self.free_rects
+                if not self._contains(reach, rect) or not any(self._contains(other, rect) for other in grown)]
+        self.free_rects = kept + grown
+
+    def _cells_of(self, rect):
+        x, y, w, h = rect
+        size = self.CELL_SIZE
+        for column in range(x // size, (x + w - 1) // size + 1):
+            for row in range(y // size, (y + h - 1) // size + 1):
+                yield column, row
+
+    @staticmethod
+    def _bounds(rects):
+        left = min(x for x, _, _, _ in rects)
+        top = min(y for _, y, _, _ in rects)
+        right = max(x + w for x, _, w, _ in rects)
+        bottom = max(y + h for _, y, _, h in rects)
+        return left, top, right - left, bottom - top
+
+    @staticmethod
+    def _ring(left, top, right, bottom):
+        # Ячейки по краю блока [left, right] x [top, bottom]; для вырожденного блока — сам блок
+        for column in range(left, right + 1):
+            yield column, top
+            if bottom > top:
+                yield column, bottom
+        for row in range(top + 1, bottom):
+            yield left, row
+            if right > left:
+                yield right, row
+
+    def _split_free_rects(self, used):
+        untouched, split = self._split(self.free_rects, used)
+        self.free_rects = untouched + self._prune(split, untouched)
+
+    @staticmethod
+    def _split(free_rects, used):
+        ux, uy, uw, uh = used
+        untouched = []
+        split = []
+
+        for free in free_rects:
+            fx, fy, fw, fh = free
+            if ux >= fx + fw or ux + uw <= fx or uy >= fy + fh or uy + uh <= fy:
+                untouched.append(free)
+                continue
+
+            if ux > fx:
+                split.append((fx, fy, ux - fx, fh))
+            if ux + uw < fx + fw:
+                split.append((ux + uw, fy, fx + fw - ux - uw, fh))
+            if uy > fy:
+                split.append((fx, fy, fw, uy - fy))
+            if uy + uh < fy + fh:
+                split.append((fx, uy + uh, fw, fy + fh - uy - uh))
+
+        return untouched, split
+
+    @staticmethod
+    def _intersects(a, b):
+        ax, ay, aw, ah = a
+        bx, by, bw, bh = b
+        return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+    @staticmethod
+    def _contains(outer, inner):
+        ox, oy, ow, oh = outer
+        ix, iy, iw, ih = inner
+        return ox <= ix and oy <= iy and ix + iw <= ox + ow and iy + ih <= oy + oh
+
+    @staticmethod
+    def _prune(split, untouched):
+        # Нетронутые прямоугольники уже максимальны друг относительно друга,
+        # поэтому проверяем на вложенность только новые куски
+        split = sorted(set(split), key=lambda r: r[2] * r[3], reverse=True)
+        kept = []
+        for rect in split:
+            if any(MaxRectsBin._contains(other, rect) for other in kept):
+                continue
+            if any(MaxRectsBin._contains(other, rect) for other in untouched):
+                continue
+            kept.append(rect)
+        return kept
+
+
+class MaxRectsPacker(PackerBase):
+    sort_key = staticmethod(SORT_KEYS['area'])
+
+    def create_bin(self):
+        return MaxRectsBin(self.bin_width, self.bin_height)
@@ -0,0 +1,84 @@
+from bisect import bisect_left, insort
+from typing import List
+
+from app.custom_elements.DrawableRect import DrawableRect
+from app.packers.PackerBase import PackerBase, Item, Placement
+from app.packers.SkylinePacker import SkylinePacker
+
+
+class MultiBinPacker(PackerBase):
+    """
+    Упаковка в несколько одинаковых ящиков: новый ящик открывается, когда элемент не влез в открытые.
+    Ящики упорядочены по остатку свободной площади (bisect), поэтому кандидат выбирается за O(log bins).
+    Пробуем ящики с наибольшим остатком: почти заполненные ящики фрагментированы,
+    и попытки положить в них элемент обычно неудачны.
+    """
+
+    # Сколько ящиков с наибольшим остатком пробуем, прежде чем открыть новый
+    MAX_ATTEMPTS = 8
+
+    def __init__(self, bin_width: int, bin_height: int, allow_rotation: bool = False,
+                 engine: type[PackerBase] = SkylinePacker):
+        super().__init__(bin_width, bin_height, allow_rotation)
+        self.engine = engine(bin_width, bin_height, allow_rotation)
+        self.sort_key = self.engine.sort_key
+        self.normalize_upright = self.engine.normalize_upright
+
+    def create_bin(self):
+        return self.engine.create_bin()
+
+    def pack(self, source_rects: List[DrawableRect], on_complete):
+        items = [(r.rect_id, r.rect.width, r.rect.height) for r in source_rects]
+
+        packed = []
+        for bin_index, placements in enumerate(self.place_cached(items, self.place_bins)):
+            for rect in self.to_drawable(placements, source_rects):
+                rect.bin_index = bin_index
+                packed.append(rect)
+
+        if self.cancelled:
+            return
+
+        self.result = packed
+        on_complete(self.result)
+
+    def cache_key(self):
+        return *super().cache_key(), type(self.engine).__name__
+
+    def place_bins(self, items: List[Item]) -> List[List[Placement]]:
+        items, rotated, order = self.prepare_items(items)
+
+        bins = []
+        placements = []
+        # Отсортированный индекс (свободная площадь, номер ящика)
+        free_index = []
+
+        for i in order:
+            item = items[i]
+            area = item[1] * item[2]
+
+            placement = None
+            # Ящики, где свободной площади меньше площади элемента, не рассматриваем
+            lowest = max(bisect_left(free_index, (area, -1)), len(free_index) - self.MAX_ATTEMPTS)
+            for position in range(len(free_index) - 1, lowest - 1, -1):
+                free_area, bin_index = free_index[position]
+                placement = self.insert_item(bins[bin_index], item, rotated[i])
+                if placement is not None:
+                    del free_index[position]
+                    insort(free_index, (free_area - area, bin_index))
+                    break
+
+            if placement is None:
+                new_bin = self.create_bin()
+                placement = self.insert_item(new_bin, item, rotated[i])
+                if placement is None:
+                    # Не влезает даже в пустой ящик
+                    continue
+                bin_index = len(bins)
+                bins.append(new_bin)
+                placements.append([])
+                insort(free_index, (self.bin_width * self.bin_height - area, bin_index))
+
+            placements[bin_index].append(placement)
+
+        return placements
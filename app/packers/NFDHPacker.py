@@ -1,48 +1,141 @@
-import threading
-from typing import List
+import numpy as np
 
-import pygame
+from app.packers.PackerBase import PackerBase, PLACEMENT_DTYPE
 
-from app.custom_elements.DrawableRect import DrawableRect
 
+class NFDHBin:
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
 
-class NFDHPacker:
-    def __init__(self, bin_width: int, bin_height: int):
-        self.bin_width = bin_width
-        self.bin_height = bin_height
+        self.x_cursor = 0
+        self.y_cursor = 0
+        self.current_row_height = 0
 
-        self.result = None
+    def insert(self, width: int, height: int, allow_rotation: bool = False):
+        # Не влезает в остаток строки, но влезает повернутым и не выше строки — ставим повернутым
+        if allow_rotation and not self._fits_row(width, height) and self._fits_row(height, width):
+            return self._place(height, width, True)
 
-    def start(self, source_rects: List[DrawableRect], on_complete):
-        self.result = None
-        packer_thread = threading.Thread(target=self.pack, args=(source_rects, on_complete), daemon=True)
-        packer_thread.start()
+        if width > self.width or height > self.height:
+            return None
 
-    def pack(self, source_rects: List[DrawableRect], on_complete):
-        source_rects = [(r.rect_id, r.rect, r.image) for r in source_rects]
-        source_rects = sorted(source_rects, key=lambda r: r[1].height, reverse=True)
+        if self.x_cursor + width > self.width:
+            self.y_cursor += self.current_row_height
+            self.x_cursor = 0
+            self.current_row_height = 0
 
-        packed = []
+        if self.y_cursor + height > self.height:
+            return None
 
-        x_cursor = 0
-        y_cursor = 0
-        current_row_height = 0
+        return self._place(width, height, False)
 
-        for rect_id, rect, image in source_rects:
-            if rect.width > self.bin_width or rect.height > self.bin_height:
-                continue
+    def _fits_row(self, width: int, height: int):
+        return self.x_cursor + width <= self.width and height <= self.current_row_height
 
-            if x_cursor + rect.width > self.bin_width:
-                y_cursor += current_row_height
-                x_cursor = 0
-                current_row_height = 0
+    def _place(self, width: int, height: int, rotated: bool):
+        position = (self.x_cursor, self.y_cursor, width, height, rotated)
 
-            if y_cursor + rect.height > self.bin_height:
-                continue
+        self.x_cursor += width
+        self.current_row_height = max(self.current_row_height, height)
+        return position
 
-            packed.append(DrawableRect(pygame.Rect(x_cursor, y_cursor, rect.width, rect.height), rect_id=rect_id, image=image))
 
-            x_cursor += rect.width
-            current_row_height = max(current_row_height, rect.height)
+class NFDHPacker(PackerBase):
+    # Узкие высокие элементы дают плотнее строки/skyline, чем положенные плашмя
+    normalize_upright = True
 
-        on_complete(packed)
+    def create_bin(self):
+        return NFDHBin(self.bin_width, self.bin_height)
+
+    def pack_array(self, items: np.ndarray) -> np.ndarray:
+        """
+        Пакетный NFDH без объектов на каждый элемент.
+
+        :param items: структурированный массив ITEM_DTYPE (id, w, h)
+        :return: массив PLACEMENT_DTYPE (id, x, y, w, h, rotated) — то же размещение, что даёт pack()
+                 (при allow_rotation ориентация выбирается только нормализацией, без поворота внутри строки)
+        """
+        rotated = np.zeros(len(items), dtype=np.bool_)
+        if self.allow_rotation:
+            widths, heights, rotated = self.orient(items['w'], items['h'])
+            items = items.copy()
+            items['w'], items['h'] = widths, heights
+
+        fits = (items['w'] <= self.bin_width) & (items['h'] <= self.bin_height)
+        items, rotated = items[fits], rotated[fits]
+        order = np.argsort(-items['h'], kind='stable')
+        items, rotated = items[order], rotated[order]
+
+        widths = items['w'].astype(np.int64)
+        heights = items['h'].astype(np.int64)
+        width_cumsum = np.concatenate(([0], np.cumsum(widths)))
+        count = len(items)
+
+        # Для каждого элемента — с какого элемента началась бы следующая строка, если строка начата с него
+        next_row_start = np.searchsorted(width_cumsum, width_cumsum[:-1] + self.bin_width, side='right') - 1
+        row_starts = self._follow_chain(np.append(next_row_start, count), count)
+        row_ys = np.concatenate(([0], np.cumsum(heights[row_starts])))[:-1]
+
+        # Пока строка целиком влезает по высоте, пропусков не бывает, и цепочка строк точна.
+        # Хвост (остаток высоты меньше высоты строки) доигрываем построчно с пропусками.
+        overflow = np.flatnonzero(row_ys + heights[row_starts] > self.bin_height)
+        if len(overflow):
+            first = overflow[0]
+            tail_starts, tail_ys = self._pack_tail(heights, width_cumsum, int(row_starts[first]), int(row_ys[first]))
+            row_starts = np.concatenate((row_starts[:first], tail_starts))
+            row_ys = np.concatenate((row_ys[:first], tail_ys))
+
+        row_ends = np.append(next_row_start, count)[row_starts]
+
+        row_lengths = row_ends - row_starts
+        row_of_item = np.repeat(np.arange(len(row_starts)), row_lengths)
+
+        # Индексы элементов всех строк: start строки + позиция внутри строки
+        position_in_row = np.arange(row_lengths.sum()) - np.repeat(np.cumsum(row_lengths) - row_lengths, row_lengths)
+        indices = row_starts[row_of_item] + position_in_row
+
+        placements = np.empty(len(indices), dtype=PLACEMENT_DTYPE)
+        placements['id'] = items['id'][indices]
+        placements['x'] = width_cumsum[indices] - width_cumsum[row_starts[row_of_item]]
+        placements['y'] = row_ys[row_of_item]
+        placements['w'] = widths[indices]
+        placements['h'] = heights[indices]
+        placements['rotated'] = rotated[indices]
+        return placements
+
+    @staticmethod
+    def _follow_chain(next_index: np.ndarray, terminal: int) -> np.ndarray:
+        """Все элементы цепочки 0 -> next_index[0] -> ... (удвоением шага, без цикла по элементам)."""
+        if terminal == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        members = np.zeros(1, dtype=np.int64)
+        jump = next_index
+        while True:
+            reached = jump[members]
+            reached = reached[reached < terminal]
+            if not len(reached):
+                break
+            members = np.concatenate((members, reached))
+            jump = jump[jump]
+        return np.sort(members)
+
+    def _pack_tail(self, heights, width_cumsum, start, y):
+        count = len(heights)
+        neg_heights = -heights
+        row_starts, row_ys = [], []
+
+        while start < count:
+            # После переноса строки элементы, не влезающие по высоте, пропускаются
+            start = max(start, int(np.searchsorted(neg_heights, y - self.bin_height, side='left')))
+            if start >= count:
+                break
+
+            row_starts.append(start)
+            row_ys.append(y)
+
+            y += int(heights[start])
+            start = int(np.searchsorted(width_cumsum, width_cumsum[start] + self.bin_width, side='right')) - 1
+
+        return np.array(row_starts, dtype=np.int64), np.array(row_ys, dtype=np.int64)
@@ -0,0 +1,110 @@
+import math
+import random
+from typing import List
+
+import pygame
+
+from app.common import Colors
+from app.custom_elements.DrawableRect import DrawableRect
+from app.packers.MaxRectsPacker import MaxRectsBin
+
+
+class _Track:
+    def __init__(self, center, size):
+        self.center = center
+        self.size = size
+        self.missed = 0
+        self.drawable: DrawableRect | None = None
+
+
+class OnlinePacker:
+    """
+    Онлайн-упаковка по мере обнаружения коробок: MaxRects-ящик живёт между кадрами,
+    новые коробки вставляются, пропавшие освобождают место. Полной переупаковки нет: вставка просматривает
+    только свободные прямоугольники, удаление пересчитывает свободное место, не двигая остальные коробки.
+    """
+
+    # Насколько может сместиться центр коробки между кадрами, чтобы считаться той же
+    MATCH_DISTANCE = 25
+    # Допустимое относительное изменение размеров той же коробки
+    SIZE_TOLERANCE = 0.2
+    # Сколько кадров подряд коробку может не быть видно, прежде чем её место освободится
+    MAX_MISSED_FRAMES = 5
+
+    def __init__(self, bin_width: int, bin_height: int, allow_rotation: bool = False):
+        self.bin = MaxRectsBin(int(bin_width), int(bin_height))
+        self.allow_rotation = allow_rotation
+
+        self.tracks: List[_Track] = []
+
+    def sync(self, boxes) -> bool:
+        """
+        :param boxes: обнаруженные коробки текущего кадра, ((cx, cy), (w, h)) как у cv2.minAreaRect
+        :return: изменилось ли размещение
+        """
+        changed = False
+        unmatched = list(self.tracks)
+
+        for center, size in boxes:
+            track = self._match(unmatched, center, size)
+            if track is None:
+                track = _Track(center, size)
+                self.tracks.append(track)
+                changed |= self._insert(track)
+            else:
+                unmatched.remove(track)
+                track.center, track.missed = center, 0
+
+        for track in unmatched:
+            track.missed += 1
+            if track.missed > self.MAX_MISSED_FRAMES:
+                self.tracks.remove(track)
+                changed |= self._remove(track)
+
+        if changed:
+            # Освободилось место — пробуем положить то, что раньше не влезло
+            for track in self.tracks:
+                if track.drawable is None:
+                    self._insert(track)
+
+        return changed
+
+    def get_placed(self) -> List[DrawableRect]:
+        return [track.drawable for track in self.tracks if track.drawable is not None]
+
+    def _match(self, tracks: List[_Track], center, size):
+        best, best_distance = None, self.MATCH_DISTANCE
+        for track in tracks:
+            distance = math.dist(track.center, center)
+            if distance > best_distance or not self._same_size(track.size, size):
+                continue
+            best, best_distance = track, distance
+        return best
+
+    def _same_size(self, a, b):
+        # minAreaRect может поменять местами ширину и высоту, поэтому сравниваем отсортированные стороны
+        for side_a, side_b in zip(sorted(a), sorted(b)):
+            if abs(side_a - side_b) > self.SIZE_TOLERANCE * max(side_a, side_b, 1):
+                return False
+        return True
+
+    def _insert(self, track: _Track) -> bool:
+        width, height = int(track.size[0]), int(track.size[1])
+        if width <= 0 or height <= 0:
+            return False
+
+        placed = self.bin.insert(width, height, self.allow_rotation, rect_id=id(track))
+        if placed is None:
+            return False
+
+        x, y, width, height, rotated = placed
+        track.drawable = DrawableRect(pygame.Rect(x, y, width, height), rotated=rotated,
+                                     back_color=random.choice(Colors.RECTANGLE_COLORS))
+        return True
+
+    def _remove(self, track: _Track) -> bool:
+        if track.drawable is None:
+            return False
+        self.bin.remove(id(track))
+        track.drawable = None
+        return True
@@ -0,0 +1,154 @@
+import threading
+from typing import List, Tuple
+
+import numpy as np
+import pygame
+
+from app.custom_elements.DrawableRect import DrawableRect
+from app.packers.PackingCache import PackingCache, packing_cache
+
+# (rect_id, width, height)
+Item = Tuple[int, int, int]
+# (rect_id, x, y, width, height, rotated) — width/height уже с учётом поворота
+Placement = Tuple[int, int, int, int, int, bool]
+
+# Пакетный режим: массивы numpy вместо списков DrawableRect
+ITEM_DTYPE = np.dtype([('id', np.int64), ('w', np.int32), ('h', np.int32)])
+PLACEMENT_DTYPE = np.dtype([('id', np.int64), ('x', np.int32), ('y', np.int32), ('w', np.int32), ('h', np.int32),
+                            ('rotated', np.bool_)])
+
+# Порядки сортировки элементов перед укладкой (по убыванию)
+SORT_KEYS = {
+    'height': lambda item: item[2],
+    'width': lambda item: item[1],
+    'area': lambda item: item[1] * item[2],
+    'perimeter': lambda item: item[1] + item[2],
+}
+
+
+class PackerBase:
+    """
+    Общий интерфейс упаковщиков: все движки принимают список DrawableRect
+    и возвращают список DrawableRect с координатами внутри ящика.
+    Наследники реализуют create_bin() (или переопределяют place()).
+    """
+
+    # Ориентация, к которой приводятся элементы при allow_rotation (см. orient)
+    normalize_upright = False
+    sort_key = staticmethod(SORT_KEYS['height'])
+    # Общий кэш результатов; None — не кэшировать
+    cache: PackingCache | None = packing_cache
+
+    def __init__(self, bin_width: int, bin_height: int, allow_rotation: bool = False):
+        self.bin_width = int(bin_width)
+        self.bin_height = int(bin_height)
+        self.allow_rotation = allow_rotation
+
+        self.result = None
+        self._cancelled = threading.Event()
+
+    def start(self, source_rects: List[DrawableRect], on_complete):
+        self.result = None
+        self._cancelled.clear()
+        packer_thread = threading.Thread(target=self.pack, args=(source_rects, on_complete), daemon=True)
+        packer_thread.start()
+
+    def pack(self, source_rects: List[DrawableRect], on_complete):
+        items = [(r.rect_id, r.rect.width, r.rect.height) for r in source_rects]
+        placements = self.place_cached(items, self.place)
+        if self.cancelled:
+            return
+
+        self.result = self.to_drawable(placements, source_rects)
+        on_complete(self.result)
+
+    def place_cached(self, items: List[Item], place):
+        if self.cache is None:
+            return place(items)
+
+        key, canonical_ids = self.cache.make_key(self.cache_key(), items)
+        placements = self.cache.get(key, canonical_ids)
+        if placements is None:
+            placements = place(items)
+            if not self.cancelled and self.result_cacheable():
+                self.cache.put(key, canonical_ids, placements)
+        return placements
+
+    def result_cacheable(self) -> bool:
+        """
+        Можно ли кэшировать результат последнего place(). Упаковщики, чей результат зависит от бюджета
+        времени (не успели досчитать), возвращают False: иначе недосчитанное размещение закрепится навсегда.
+        """
+        return True
+
+    def cache_key(self):
+        return type(self).__name__, self.bin_width, self.bin_height, self.allow_rotation
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def place(self, items: List[Item]) -> List[Placement]:
+        items, rotated, order = self.prepare_items(items)
+        packing_bin = self.create_bin()
+
+        placements = []
+        for i in order:
+            placement = self.insert_item(packing_bin, items[i], rotated[i])
+            if placement is not None:
+                placements.append(placement)
+        return placements
+
+    def prepare_items(self, items: List[Item]):
+        rotated = [False] * len(items)
+        if self.allow_rotation:
+            items, rotated = self.normalize_orientation(items)
+
+        order = sorted(range(len(items)), key=lambda i: self.sort_key(items[i]), reverse=True)
+        return items, rotated, order
+
+    def insert_item(self, packing_bin, item: Item, rotated: bool) -> Placement | None:
+        rect_id, width, height = item
+        position = packing_bin.insert(width, height, self.allow_rotation)
+        if position is None:
+            return None
+        x, y, placed_width, placed_height, turned = position
+        return rect_id, x, y, placed_width, placed_height, turned != rotated
+
+    def normalize_orientation(self, items: List[Item]):
+        sizes = np.array([(width, height) for _, width, height in items], dtype=np.int64).reshape(-1, 2)
+        widths, heights, rotated = self.orient(sizes[:, 0], sizes[:, 1])
+        items = [(rect_id, int(w), int(h)) for (rect_id, _, _), w, h in zip(items, widths, heights)]
+        return items, rotated.tolist()
+
+    def orient(self, widths: np.ndarray, heights: np.ndarray):
+        """
+        Приводит все элементы к одной ориентации: стоя (h >= w) при normalize_upright, иначе плашмя.
+        Если в этой ориентации элемент не влезает в ящик, берётся другая.
+        """
+        long_side = np.maximum(widths, heights)
+        short_side = np.minimum(widths, heights)
+        if self.normalize_upright:
+            new_widths, new_heights = short_side, long_side
+        else:
+            new_widths, new_heights = long_side, short_side
+
+        fits = (new_widths <= self.bin_width) & (new_heights <= self.bin_height)
+        new_widths, new_heights = np.where(fits, new_widths, new_heights), np.where(fits, new_heights, new_widths)
+        return new_widths, new_heights, new_widths != widths
+
+    def create_bin(self):
+        raise NotImplementedError
+
+    @staticmethod
+    def to_drawable(placements: List[Placement], source_rects: List[DrawableRect]) -> List[DrawableRect]:
+        sources = {r.rect_id: r for r in source_rects}
+        packed = []
+        for rect_id, x, y, width, height, rotated in placements:
+            source = sources[rect_id]
+            packed.append(DrawableRect(pygame.Rect(x, y, width, height), rect_id=rect_id, image=source.image,
+                                       back_color=source.back_color, rotated=rotated))
+        return packed
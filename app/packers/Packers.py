@@ -0,0 +1,51 @@
+from app.packers.AnnealingPacker import AnnealingPacker
+from app.packers.ExactPacker import ExactPacker
+from app.packers.GuillotinePacker import GuillotinePacker
+from app.packers.MaxRectsPacker import MaxRectsPacker
+from app.packers.MultiBinPacker import MultiBinPacker
+from app.packers.NFDHPacker import NFDHPacker
+from app.packers.PackerBase import PackerBase
+from app.packers.PortfolioPacker import PortfolioPacker
+from app.packers.SkylinePacker import SkylinePacker
+
+# Движки, работающие через create_bin(): их можно оборачивать в MultiBinPacker
+ENGINES: dict[str, type[PackerBase]] = {
+    "NFDH": NFDHPacker,
+    "MaxRects": MaxRectsPacker,
+    "Skyline": SkylinePacker,
+    "Guillotine": GuillotinePacker,
+}
+
+PACKERS: dict[str, type[PackerBase]] = {
+    **ENGINES,
+    "Portfolio": PortfolioPacker,
+    "Annealing": AnnealingPacker,
+    "Exact": ExactPacker,
+}
+
+
+def create_packer(name: str, bin_width: int, bin_height: int, allow_rotation: bool = False,
+                  multi_bin: bool = False, source_rects=None) -> PackerBase:
+    """
+    :param source_rects: коробки, которые будут упакованы; если их мало, эвристический движок
+                         заменяется точным ExactPacker. Для нескольких ящиков точный результат используется,
+                         только если в один ящик легло всё, иначе упаковывает MultiBinPacker
+    """
+    multi_bin_packer = None
+    if multi_bin and name in ENGINES:
+        multi_bin_packer = MultiBinPacker(bin_width, bin_height, allow_rotation, engine=PACKERS[name])
+
+    if source_rects is not None and name in ENGINES and len(source_rects) <= ExactPacker.MAX_ITEMS:
+        items_area = sum(rect.rect.width * rect.rect.height for rect in source_rects)
+        # Больше площади ящика — в один точно не влезет, перебор не нужен
+        if multi_bin_packer is None or items_area <= bin_width * bin_height:
+            return ExactPacker(bin_width, bin_height, allow_rotation, fallback=multi_bin_packer)
+
+    if multi_bin_packer is not None:
+        return multi_bin_packer
+    return PACKERS[name](bin_width, bin_height, allow_rotation)
+
+
+def next_packer_name(name: str) -> str:
+    names = list(PACKERS)
+    return names[(names.index(name) + 1) % len(names)]
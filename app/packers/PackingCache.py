@@ -0,0 +1,78 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class PackingCache:
+    """
+    LRU-кэш результатов упаковки. Ключ — хэш отсортированного мультимножества размеров (w, h),
+    размера ящика и настроек упаковщика. Элементы одинакового размера взаимозаменяемы, поэтому
+    размещения хранятся по каноническому номеру элемента и при попадании переназначаются на текущие rect_id.
+    """
+
+    def __init__(self, max_size: int = 64):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @staticmethod
+    def make_key(packer_key, items):
+        """
+        :return: (ключ, rect_id элементов в каноническом порядке)
+        """
+        canonical = sorted(range(len(items)), key=lambda i: (items[i][1], items[i][2]))
+        sizes = tuple((items[i][1], items[i][2]) for i in canonical)
+        digest = hashlib.blake2b(repr((packer_key, sizes)).encode(), digest_size=16).hexdigest()
+        return digest, [items[i][0] for i in canonical]
+
+    def get(self, key, canonical_ids):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return self._remap(entry, canonical_ids)
+
+    def put(self, key, canonical_ids, placements):
+        index_by_id = {rect_id: i for i, rect_id in enumerate(canonical_ids)}
+        entry = self._remap(placements, index_by_id)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _remap(placements, mapping):
+        # Размещение — кортеж с rect_id на первом месте; у MultiBinPacker это список списков по ящикам
+        remapped = []
+        for placement in placements:
+            if isinstance(placement, list):
+                remapped.append(PackingCache._remap(placement, mapping))
+            else:
+                remapped.append((mapping[placement[0]], *placement[1:]))
+        return remapped
+
+
+packing_cache = PackingCache()
@@ -0,0 +1,91 @@
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+from typing import List
+
+from app.common.ProcessPool import get_process_pool, warm_up_process_pool
+from app.packers.GuillotinePacker import GuillotinePacker
+from app.packers.MaxRectsPacker import MaxRectsPacker
+from app.packers.NFDHPacker import NFDHPacker
+from app.packers.PackerBase import PackerBase, Item, Placement, SORT_KEYS
+from app.packers.SkylinePacker import SkylinePacker
+
+
+def _run_candidate(engine: type[PackerBase], sort_name: str, bin_width: int, bin_height: int,
+                   allow_rotation: bool, items: List[Item]) -> List[Placement]:
+    packer = engine(bin_width, bin_height, allow_rotation)
+    packer.sort_key = SORT_KEYS[sort_name]
+    return packer.place(items)
+
+
+def _warm_up():
+    # Ничего не делает: процесс пула, распаковав задачу, уже импортировал этот модуль и все движки
+    pass
+
+
+class PortfolioPacker(PackerBase):
+    """
+    Запускает несколько эвристик с разными порядками сортировки параллельно в пуле процессов
+    и возвращает самое плотное размещение из успевших за time_budget секунд.
+    Если к сроку не успел ни один кандидат (пул ещё поднимается, медленная машина, короткий бюджет),
+    укладывает FALLBACK прямо в этом потоке, чтобы не вернуть пустое размещение.
+    """
+
+    ENGINES = (NFDHPacker, MaxRectsPacker, SkylinePacker, GuillotinePacker)
+    FALLBACK = SkylinePacker
+
+    def __init__(self, bin_width: int, bin_height: int, allow_rotation: bool = False, time_budget: float = 1.0,
+                 engines=ENGINES, sort_names=tuple(SORT_KEYS)):
+        super().__init__(bin_width, bin_height, allow_rotation)
+        self.time_budget = time_budget
+        self.engines = engines
+        self.sort_names = sort_names
+
+        self.best_candidate = None
+        # Все кандидаты досчитаны: результат не зависит от того, кто успел к сроку
+        self.complete = False
+
+        warm_up_process_pool(_warm_up)
+
+    def result_cacheable(self) -> bool:
+        return self.complete
+
+    def place(self, items: List[Item]) -> List[Placement]:
+        deadline = time.monotonic() + self.time_budget
+        executor = get_process_pool()
+
+        candidates = {}
+        for engine in self.engines:
+            for sort_name in self.sort_names:
+                future = executor.submit(_run_candidate, engine, sort_name, self.bin_width, self.bin_height,
+                                         self.allow_rotation, items)
+                candidates[future] = (engine.__name__, sort_name)
+
+        best, best_area = [], -1
+        self.best_candidate = None
+        pending = set(candidates)
+
+        while pending and not self.cancelled:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=min(remaining, 0.05), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    continue
+                placements = future.result()
+                area = sum(p[3] * p[4] for p in placements)
+                if area > best_area:
+                    best, best_area = placements, area
+                    self.best_candidate = candidates[future]
+
+        # Не успевшие стартовать задачи снимаем, уже запущенные просто доработают в фоне
+        for future in pending:
+            future.cancel()
+        self.complete = not pending
+
+        if self.best_candidate is None and not self.cancelled:
+            fallback = self.FALLBACK(self.bin_width, self.bin_height, self.allow_rotation)
+            best = fallback.place(items)
+            self.best_candidate = (self.FALLBACK.__name__, 'fallback')
+
+        return best
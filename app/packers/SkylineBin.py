@@ -0,0 +1,103 @@
+import numpy as np
+
+
+class SkylineBin:
+    """
+    Skyline (bottom-left). Верхняя граница хранится списком сегментов (начало x, высота) в массивах numpy,
+    соседние сегменты одной высоты сливаются. Нижняя-левая позиция всегда начинается с начала сегмента:
+    сдвиг влево внутри сегмента не поднимает уровень. Поэтому уровни считаются только для начал сегментов,
+    одним maximum.reduceat по диапазонам сегментов под элементом.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.xs = np.zeros(1, dtype=np.int64)
+        self.ys = np.zeros(1, dtype=np.int64)
+        # Нижняя точка линии: элемент выше height - min_level не влезет ни в какую позицию
+        self.min_level = 0
+        # Лучшая позиция (x, y) для каждой уже запрошенной ширины; от высоты элемента она не зависит
+        # и верна, пока вставка не задела её окно. Когда ящик заполнен, отказ — один поиск в словаре
+        self._best = {}
+
+    def top(self) -> int:
+        return int(self.ys.max())
+
+    def raise_to(self, level: int):
+        """Выравнивает всю линию на высоте level."""
+        self.xs = np.zeros(1, dtype=np.int64)
+        self.ys = np.full(1, level, dtype=np.int64)
+        self.min_level = level
+        self._best.clear()
+
+    def find_position(self, width: int, height: int):
+        if width > self.width or height > self.height - self.min_level:
+            return None
+
+        best = self._best.get(width)
+        if best is None:
+            best = self._best[width] = self._lowest_position(width)
+        x, y = best
+        if y + height > self.height:
+            return None
+        return x, y
+
+    def _lowest_position(self, width: int):
+        xs, ys = self.xs, self.ys
+        # Начала, с которых элемент не выходит за правую стенку, и первый сегмент правее элемента для каждого
+        count = int(np.searchsorted(xs, self.width - width, side='right'))
+        starts = np.arange(count)
+        ends = np.searchsorted(xs, xs[:count] + width, side='left')
+        # reduceat по парам (начало, конец): чётные результаты — максимумы высот под элементом;
+        # ноль в конце, чтобы конец мог указывать за последний сегмент
+        bounds = np.empty(2 * count, dtype=np.int64)
+        bounds[0::2], bounds[1::2] = starts, ends
+        levels = np.maximum.reduceat(np.append(ys, 0), bounds)[0::2]
+
+        i = int(np.argmin(levels))
+        return int(xs[i]), int(levels[i])
+
+    def insert(self, width: int, height: int, allow_rotation: bool = False):
+        candidates = [(width, height, False)]
+        if allow_rotation and width != height:
+            candidates.append((height, width, True))
+
+        best = None
+        for w, h, rotated in candidates:
+            position = self.find_position(w, h)
+            if position is None:
+                continue
+            x, y = position
+            # Нижний-левый: минимальная верхняя граница, затем минимальный x
+            if best is None or (y + h, x) < (best[1] + best[3], best[0]):
+                best = (x, y, w, h, rotated)
+
+        if best is None:
+            return None
+
+        x, y, w, h, _ = best
+        self._raise_span(x, x + w, y + h)
+        return best
+
+    def _raise_span(self, x0: int, x1: int, level: int):
+        xs, ys = self.xs, self.ys
+        # Сегменты, начинающиеся внутри [x0, x1), заменяются одним новым
+        left = int(np.searchsorted(xs, x0, side='left'))
+        right = int(np.searchsorted(xs, x1, side='left'))
+
+        new_xs, new_ys = [x0], [level]
+        # Хвост сегмента, частично накрытого справа, продолжается от x1
+        if x1 < self.width and (right == len(xs) or xs[right] != x1):
+            new_xs.append(x1)
+            new_ys.append(int(ys[right - 1]))
+        xs = np.concatenate((xs[:left], new_xs, xs[right:]))
+        ys = np.concatenate((ys[:left], new_ys, ys[right:]))
+
+        # Слияние соседей одной высоты вокруг изменённого участка
+        lo, hi = max(left - 1, 0), min(left + 3, len(xs))
+        keep = np.ones(len(xs), dtype=bool)
+        keep[lo + 1:hi] = ys[lo + 1:hi] != ys[lo:hi - 1]
+        self.xs, self.ys = xs[keep], ys[keep]
+        self.min_level = int(self.ys.min())
+        # Уровни только растут: позиция, окно которой не задето, остаётся самой низкой и левой
+        self._best = {width: (x, y) for width, (x, y) in self._best.items() if x + width <= x0 or x >= x1}
@@ -0,0 +1,10 @@
+from app.packers.PackerBase import PackerBase
+from app.packers.SkylineBin import SkylineBin
+
+
+class SkylinePacker(PackerBase):
+    # Узкие высокие элементы дают плотнее строки/skyline, чем положенные плашмя
+    normalize_upright = True
+
+    def create_bin(self):
+        return SkylineBin(self.bin_width, self.bin_height)
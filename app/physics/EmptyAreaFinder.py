@@ -1,6 +1,10 @@
 import cv2
 import numpy as np
-from scipy.ndimage import label
+
+# Прямоугольники меньше этой площади (в пикселях) не выделяются
+MIN_AREA = 64
+# Сколько самых больших кандидатов рассматривается за один проход
+MAX_CANDIDATES = 1024
 
 
 def binarize_image(image, white_threshold=240):
@@ -9,89 +13,122 @@ def binarize_image(image, white_threshold=240):
     return binary // 255  # 1 for white, 0 for other
 
 
-def find_connected_components(binary_mask):
-    labeled_array, num_features = label(binary_mask)
-    return labeled_array, num_features
-
-
-def find_cut_lines(region_mask):
-    rows, cols = region_mask.shape
-    h_cuts = [0]
-    for r in range(1, rows):
-        if not np.array_equal(region_mask[r], region_mask[r - 1]):
-            h_cuts.append(r)
-    h_cuts.append(rows)
-
-    v_cuts = [0]
-    for c in range(1, cols):
-        if not np.array_equal(region_mask[:, c], region_mask[:, c - 1]):
-            v_cuts.append(c)
-    v_cuts.append(cols)
+def maximal_rectangles(mask):
+    """
+    Для каждой свободной клетки — наибольший прямоугольник, нижняя сторона которого проходит через клетку,
+    а высота равна столбику свободных клеток над ней (DP height/left/right, посчитанный сразу для всех строк).
+
+    :return: (left, right, heights) — массивы формы mask; прямоугольник клетки (r, c):
+             x = left, y = r - height + 1, ширина right - left
+    """
+    free = mask.astype(bool)
+    rows, cols = free.shape
+    blocked = ~free
+
+    # Промежуточные массивы переиспользуются на месте (out=): DP гоняется на каждом проходе
+    row_index = np.arange(rows, dtype=np.int32)[:, None]
+    heights = np.where(blocked, row_index, -1)
+    np.maximum.accumulate(heights, axis=0, out=heights)
+    np.subtract(row_index, heights, out=heights)
+
+    # Границы горизонтального отрезка свободных клеток в своей строке
+    col_index = np.arange(cols, dtype=np.int32)
+    run_left = np.where(free, 0, col_index + 1)
+    np.maximum.accumulate(run_left, axis=1, out=run_left)
+    run_right = np.minimum.accumulate(np.where(free, cols, col_index)[:, ::-1], axis=1)[:, ::-1]
+
+    # Накопление по столбику свободных клеток: смещение на номер столбика делает
+    # accumulate сегментированным — значения нового столбика не пересекаются со старыми
+    offset = np.cumsum(blocked, axis=0, dtype=np.int32)
+    offset *= np.int32(cols + 1)
+    run_left *= free
+    run_left += offset
+    left = np.maximum.accumulate(run_left, axis=0, out=run_left)
+    left -= offset
+    run_right[blocked] = cols
+    run_right -= offset
+    right = np.minimum.accumulate(run_right, axis=0)
+    right += offset
+
+    return left, right, heights
+
+
+def extract_rectangles(mask, min_area=MIN_AREA):
+    """
+    Жадно выделяет непересекающиеся пустые прямоугольники, начиная с наибольших.
+    За проход из максимальных прямоугольников берутся все, что не пересекаются с более крупными,
+    поэтому проходов немного: следующий нужен только для остатков, пересекавшихся с выбранными.
+    Прямоугольник не выходит за связную область свободных клеток, поэтому после первого прохода
+    DP считается не по всей маске, а по рамке каждой оставшейся области, которая может вместить min_area.
+
+    :return: список (x, y, w, h)
+    """
+    mask = np.ascontiguousarray(mask, dtype=bool).copy()
+    rectangles = []
 
-    return h_cuts, v_cuts
+    # Окна (x0, y0, маска окна), в которых ещё нужно выделять прямоугольники
+    windows = [(0, 0, mask)]
+    while windows:
+        x0, y0, window = windows.pop()
+        accepted = _extract_pass(window, min_area)
+        if not accepted:
+            continue
+
+        for x, y, w, h in accepted:
+            window[y:y + h, x:x + w] = False
+            rectangles.append((x0 + x, y0 + y, w, h))
+
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(window.view(np.uint8), connectivity=4)
+        for label in range(1, count):
+            x, y, w, h, area = stats[label]
+            if area < max(min_area, 1):
+                continue
+            windows.append((x0 + x, y0 + y, labels[y:y + h, x:x + w] == label))
 
+    return rectangles
 
-def find_max_rectangle_from_point(mask, start_y, start_x):
-    max_height = mask.shape[0]
-    max_width = mask.shape[1]
-    max_area = 0
-    best_rect = None
 
-    min_width = max_width
-    for dy in range(start_y, max_height):
-        if mask[dy, start_x] == 0:
-            break
-        row_width = 0
-        for dx in range(start_x, max_width):
-            if mask[dy, dx] == 1:
-                row_width += 1
-            else:
+def _extract_pass(mask, min_area):
+    """Один проход: непересекающиеся максимальные прямоугольники маски по убыванию площади."""
+    left, right, heights = maximal_rectangles(mask)
+    areas = (right - left) * heights
+    if areas.max(initial=0) < max(min_area, 1):
+        return []
+
+    # Прямоугольник клетки, который продолжается вниз той же ширины, не максимален — его пропускаем
+    extends_down = np.zeros_like(mask)
+    extends_down[:-1] = mask[1:] & (left[1:] == left[:-1]) & (right[1:] == right[:-1])
+    rows, cols = np.nonzero((areas >= min_area) & ~extends_down)
+    x, width, height = left[rows, cols], right[rows, cols] - left[rows, cols], heights[rows, cols]
+    y = rows - height + 1
+
+    # Одинаковые прямоугольники встречаются во многих клетках: сортируем по площади и убираем повторы
+    # по упакованному в одно число ключу (площадь, y, x, высота)
+    size = mask.shape[0] + 1, mask.shape[1] + 1
+    keys = np.unique(((-(width * height).astype(np.int64) * size[0] + y) * size[1] + x) * size[0] + height)
+    keys = keys[:MAX_CANDIDATES]
+    height, keys = keys % size[0], keys // size[0]
+    x, keys = keys % size[1], keys // size[1]
+    y, neg_area = keys % size[0], keys // size[0]
+
+    width = -neg_area // height
+
+    # Принятый прямоугольник сразу снимает всех пересекающихся с ним кандидатов, одной операцией над массивами;
+    # следующий принимается первый из оставшихся
+    accepted = []
+    alive = np.ones(len(keys), dtype=bool)
+    i = 0
+    while i < len(alive):
+        if not alive[i]:
+            i += int(np.argmax(alive[i:]))
+            if not alive[i]:
                 break
-        min_width = min(min_width, row_width)
-        area = min_width * (dy - start_y + 1)
-        if area > max_area:
-            max_area = area
-            best_rect = (start_x, start_y, min_width, dy - start_y + 1)
-
-    return best_rect, max_area
-
-
-def extract_rectangles_from_region(region_mask, top_left):
-    mask = region_mask.copy()
-    max_rectangles = []
-
-    visited = np.zeros_like(mask, dtype=bool)
-    rows, cols = mask.shape
-
-    for y in range(rows):
-        for x in range(cols):
-            if mask[y, x] == 1 and not visited[y, x]:
-                rect, area = find_max_rectangle_from_point(mask, y, x)
-                if rect:
-                    rx, ry, w, h = rect
-                    # Пометить как пройдено
-                    mask[ry:ry + h, rx:rx + w] = 0
-                    visited[ry:ry + h, rx:rx + w] = True
-                    max_rectangles.append((
-                        top_left[1] + rx,
-                        top_left[0] + ry,
-                        w,
-                        h
-                    ))
-    return max_rectangles
-
-
-def find_empty_areas(image):
-    binary_mask = binarize_image(image)
-    labeled, num = find_connected_components(binary_mask)
-    rectangles = []
+        ax, ay, aw, ah = int(x[i]), int(y[i]), int(width[i]), int(height[i])
+        accepted.append((ax, ay, aw, ah))
+        alive &= (x >= ax + aw) | (x + width <= ax) | (y >= ay + ah) | (y + height <= ay)
+        i += 1
+    return accepted
 
-    for label_idx in range(1, num + 1):
-        region_mask = (labeled == label_idx).astype(np.uint8)
-        ys, xs = np.where(region_mask)
-        top, bottom, left, right = np.min(ys), np.max(ys), np.min(xs), np.max(xs)
-        sub_mask = region_mask[top:bottom + 1, left:right + 1]
-        rects = extract_rectangles_from_region(sub_mask, (top, left))
-        rectangles.extend(rects)
 
-    return rectangles
+def find_empty_areas(image, min_area=MIN_AREA):
+    return extract_rectangles(binarize_image(image), min_area)
@@ -0,0 +1,86 @@
+import cv2
+import numpy as np
+
+from app.physics.EmptyAreaFinder import MIN_AREA, extract_rectangles
+
+
+class OccupancyGrid:
+    """
+    Битовая карта занятости ящика, построенная по геометрии тел, без отрисовки.
+    Буферы создаются один раз и переиспользуются между вызовами.
+    Найденные пустые прямоугольники кэшируются: после изменения части ящика пересчитывается только
+    окно вокруг изменённой области, а не затронутые ею прямоугольники остаются как есть.
+    """
+
+    def __init__(self, x: int, y: int, width: int, height: int):
+        self.x, self.y = int(x), int(y)
+        self.width, self.height = int(width), int(height)
+
+        self.occupied = np.zeros((self.height, self.width), dtype=np.uint8)
+        self._free = np.zeros((self.height, self.width), dtype=bool)
+
+        self._areas = None
+        self._min_area = MIN_AREA
+
+    def rasterize(self, polygons: np.ndarray, region=None):
+        """
+        :param polygons: массив (N, K, 2) вершин выпуклых многоугольников в мировых координатах
+        :param region: (x0, y0, x1, y1) в мировых координатах — перерисовать только эту область
+        """
+        x0, y0, x1, y1 = self._clip(region)
+        self.occupied[y0:y1, x0:x1] = 0
+        if len(polygons) == 0 or x0 == x1 or y0 == y1:
+            return
+
+        # Рисуем в полную карту, а не в окно: иначе fillPoly обрезает наклонные рёбра по краю окна
+        # и пиксели на них расходятся с полной перерисовкой. Вне окна многоугольники, задевающие его,
+        # лишь повторно закрашивают уже занятые ими пиксели
+        local = np.rint(polygons - (self.x, self.y)).astype(np.int32)
+        touches = (local[..., 0].max(axis=1) >= x0) & (local[..., 0].min(axis=1) < x1) & \
+                  (local[..., 1].max(axis=1) >= y0) & (local[..., 1].min(axis=1) < y1)
+        # По одному: fillPoly со списком контуров оставляет пересечения многоугольников незакрашенными
+        for polygon in local[touches]:
+            cv2.fillConvexPoly(self.occupied, polygon, 1)
+
+    def empty_areas(self, min_area=MIN_AREA, region=None):
+        """
+        :param region: (x0, y0, x1, y1) в мировых координатах, изменившаяся с прошлого вызова область;
+                       None — пересчитать всё
+        :return: свободные прямоугольники (x, y, w, h) в мировых координатах
+        """
+        if region is None or self._areas is None or min_area != self._min_area:
+            np.equal(self.occupied, 0, out=self._free)
+            self._areas = [(self.x + x, self.y + y, w, h) for x, y, w, h in extract_rectangles(self._free, min_area)]
+            self._min_area = min_area
+            return list(self._areas)
+
+        x0, y0, x1, y1 = self._clip(region)
+        kept, dropped = [], []
+        for area in self._areas:
+            ax, ay, aw, ah = area[0] - self.x, area[1] - self.y, area[2], area[3]
+            intersects = ax < x1 and x0 < ax + aw and ay < y1 and y0 < ay + ah
+            (dropped if intersects else kept).append(area)
+
+        # Окно пересчёта: изменённая область и освободившиеся из кэша прямоугольники
+        for ax, ay, aw, ah in dropped:
+            x0, y0 = min(x0, ax - self.x), min(y0, ay - self.y)
+            x1, y1 = max(x1, ax - self.x + aw), max(y1, ay - self.y + ah)
+
+        free = np.equal(self.occupied[y0:y1, x0:x1], 0, out=self._free[y0:y1, x0:x1])
+        for ax, ay, aw, ah in kept:
+            left, top = max(ax - self.x - x0, 0), max(ay - self.y - y0, 0)
+            right, bottom = max(ax - self.x - x0 + aw, 0), max(ay - self.y - y0 + ah, 0)
+            free[top:bottom, left:right] = False
+
+        added = [(self.x + x0 + x, self.y + y0 + y, w, h) for x, y, w, h in extract_rectangles(free, min_area)]
+        self._areas = kept + added
+        return list(self._areas)
+
+    def _clip(self, region):
+        if region is None:
+            return 0, 0, self.width, self.height
+        x0, y0, x1, y1 = region
+        return (min(max(int(np.floor(x0)) - self.x, 0), self.width),
+                min(max(int(np.floor(y0)) - self.y, 0), self.height),
+                min(max(int(np.ceil(x1)) - self.x, 0), self.width),
+                min(max(int(np.ceil(y1)) - self.y, 0), self.height))
@@ -1,36 +1,88 @@
-import cv2
 import numpy as np
 import pymunk
 import random
 import math
 
-import pygame
+from app.packers.SkylineBin import SkylineBin
+from app.physics.OccupancyGrid import OccupancyGrid
 
-from app.common import Colors
-from app.physics.BodyTracker import BodyTracker
-from app.physics.EmptyAreaFinder import find_empty_areas
+# Состояние одного тела в снимке: размеры коробки, положение, скорости, масса и момент инерции
+# (бесконечный у коробок с запрещённым вращением)
+BODY_DTYPE = np.dtype([
+    ('w', np.float64), ('h', np.float64),
+    ('x', np.float64), ('y', np.float64), ('angle', np.float64),
+    ('vx', np.float64), ('vy', np.float64), ('angular_velocity', np.float64),
+    ('mass', np.float64), ('moment', np.float64),
+])
+
+
+class _BoxSize:
+    """Размеры коробки из снимка: у тела, восстановленного из снимка, они не обязаны совпадать с obj.rect."""
+
+    def __init__(self, width, height):
+        self.width = self.w = float(width)
+        self.height = self.h = float(height)
 
 
 class PhysicsEngine:
-    def __init__(self, box_rect: pygame.Rect, parent, speed_multiplier=1):
-        self.parent = parent
+    # Тела медленнее этой скорости (пикс/с) считаются покоящимися и засыпают через SLEEP_TIME секунд.
+    # 6 пикс/с — прежний порог: 1 пиксель за кадр из 10 шагов по 1/60 с
+    IDLE_SPEED = 6
+    SLEEP_TIME = 0.5
+    # Зазор при начальной расстановке, чтобы коробки не начинали с пересечения из-за округления
+    DROP_GAP = 0.5
+    # Сколько шагов пространства после создания тел или поворота на месте покой не засчитывается:
+    # ни разу не шагнувшие тела неподвижны, а поворот меняет положения, но не скорости, и без этой паузы
+    # куча с пересечениями сразу выглядела бы успокоившейся
+    SETTLE_STEPS = 60
+    # Пересечение глубже этого (пикс) — куча не разрешена решателем. Выталкивание из пересечений идёт
+    # не через скорость, поэтому по энергии такая куча выглядит покоящейся; ещё столько шагов после
+    # SETTLE_STEPS покой при пересечениях не засчитывается
+    MAX_PENETRATION = 2.0
+    RESOLVE_STEPS = 600
+    # Покой определяется по средней энергии, и отдельные коробки в нём ещё могут ползти. Пока куча
+    # не уснула, свободное место пересчитывается не чаще, чем раз в столько кадров update (полсекунды при 60 к/с)
+    REFRESH_FRAMES = 30
+    # Повёрнутая на месте коробка, врезавшаяся глубже этого (пикс), переносится поверх кучи
+    ROTATION_CLEARANCE = 0.5
+
+    def __init__(self, box_rect, speed_multiplier=1):
+        """
+        :param box_rect: (x, y, w, h) ящика в координатах пространства, например pygame.Rect
+        """
+        box_rect = tuple(int(v) for v in box_rect)
+        self.box_rect = box_rect
         self.speed_multiplier = speed_multiplier
         self.space = pymunk.Space()
         self.space.gravity = (0, 1000)
         self.space.damping = 0.9
         self.space.iterations = 50
         self.space.collision_slop = 0.01
+        self.space.idle_speed_threshold = self.IDLE_SPEED
+        self.space.sleep_time_threshold = self.SLEEP_TIME
 
         self._create_boundaries(box_rect)
 
         self.rectangles = []
+        self._shape_index = {}
+        self._min_mass = 0
         self.shake_timer = 10
         self._setup_collision_handler()
 
         self.rotation_index = 0
         self.rotation_done = False
-
+        self.steps_taken = 0
+        self._space_steps = 0
+        self._settle_after = self.SETTLE_STEPS
+        self._frames = 0
+        # Результат проверки покоя из последнего update: куча повернута и успокоилась
+        self.settled = False
+        self._next_refresh = 0
+
+        self.occupancy = OccupancyGrid(*box_rect)
         self.empty_areas = []
+        # Многоугольники коробок (в пикселях) на момент последнего анализа свободного места
+        self._analysed_polygons = None
 
     def _setup_collision_handler(self):
         self.collision_handler = self.space.add_default_collision_handler()
@@ -39,84 +91,280 @@ class PhysicsEngine:
     def _on_collision_begin(self, arbiter, space, data):
         return True
 
-    def _create_boundaries(self, rect: pygame.Rect):
+    def _create_boundaries(self, rect):
         s = self.space
         b = s.static_body
+        x, y, w, h = rect
 
         points = [
-            (rect.x, -10000),
-            (rect.x, rect.y + rect.h),
-            (rect.x + rect.w, rect.y + rect.h),
-            (rect.x + rect.w, -10000),
+            (x, -10000),
+            (x, y + h),
+            (x + w, y + h),
+            (x + w, -10000),
         ]
 
-        s.add(
+        # Левая стенка, дно, правая стенка
+        self.walls = [
             pymunk.Segment(b, points[0], points[1], 0),
             pymunk.Segment(b, points[1], points[2], 0),
             pymunk.Segment(b, points[2], points[3], 0),
-        )
-
-    def add_rects(self, rect_obj):
+        ]
+        s.add(*self.walls)
+
+    def add_rects(self, rect_obj, placement='skyline', angles=None):
+        """
+        :param placement: 'skyline' — коробки сразу ставятся туда, куда их положил бы Skyline-упаковщик,
+                          считая от дна ящика, и физике остаётся только локально их утрясти. Без angles
+                          коробки создаются уже повёрнутыми на 90 градусов, как после этапа поворота:
+                          поворот на месте в плотной расстановке врезал бы их в соседей;
+                          'column' — прежняя высокая колонка над ящиком, почти всё время уходит на падение,
+                          затем коробки поворачиваются по одной
+        :param angles: углы в порядке rect_obj (кратные 90 градусам): коробки сразу создаются повёрнутыми
+                       и не вращаются, расстановка учитывает размеры после поворота, этапа поворота нет
+        """
+        if angles is None and placement == 'skyline':
+            angles = [math.pi / 2] * len(rect_obj)
+        angle_by_id = None if angles is None else {id(obj): angle for obj, angle in zip(rect_obj, angles)}
         rect_obj = sorted(rect_obj, key=lambda x: x.rect.w * x.rect.h, reverse=True)
+        body_angles = [None] * len(rect_obj) if angle_by_id is None else [angle_by_id[id(obj)] for obj in rect_obj]
+
+        if placement == 'skyline':
+            positions = self._skyline_positions(rect_obj, body_angles)
+        else:
+            positions = self._column_positions(rect_obj)
+        for obj, (x, y), angle in zip(rect_obj, positions, body_angles):
+            self._add_body(x, y, obj, angle)
+        if angles is not None:
+            self.rotation_done = True
+
+        self._tune_spatial_hash()
+        self._min_mass = min((body.mass for _, body, _ in self.rectangles), default=0)
+
+    @staticmethod
+    def _column_positions(rect_obj):
         y_counter = 0
         for obj in rect_obj:
             rect = obj.rect
             x = rect.x
             y = y_counter
             y_counter -= rect.h - 10
-
-            mass = 0.1
-            inertia = pymunk.moment_for_box(mass, (rect.width, rect.height))
-            body = pymunk.Body(mass, inertia)
-            body.position = (x + rect.width / 2, y + rect.height / 2)
-
-            shape = pymunk.Poly.create_box(body, (rect.width, rect.height))
-            shape.friction = 0
-            shape.elasticity = 0
-            shape.source_object = obj
-
-            self.space.add(body, shape)
-            self.rectangles.append((rect, body, shape))
-
-        self.trackers = [BodyTracker(body) for body in self.space.bodies if body.body_type == pymunk.Body.DYNAMIC]
-
-    def get_colliding_pairs(self):
-        colliding = []
-        shapes = self.space.shapes
-        for i in range(len(shapes)):
-            for j in range(i + 1, len(shapes)):
-                s1, s2 = shapes[i], shapes[j]
-                if s1.shapes_collide(s2).points:
-                    colliding.append((s1, s2))
-        return colliding
+            yield x, y
+
+    def _skyline_positions(self, rect_obj, angles):
+        box_x, box_y, box_w, box_h = self.box_rect
+        bottom = box_y + box_h
+        # Высота без ограничения: то, что не влезло в ящик, ляжет выше его края, но тоже рядом с кучей
+        skyline = SkylineBin(box_w, sum(max(obj.rect.w, obj.rect.h) for obj in rect_obj) + box_h)
+
+        for obj, angle in zip(rect_obj, angles):
+            width, height = self._turned_size(obj.rect, angle)
+            placed = skyline.insert(width, height)
+            if placed is None:
+                # Шире ящика: кладём поверх всего, дальше разберётся физика
+                top = skyline.top()
+                skyline.raise_to(top + height)
+                yield box_x, bottom - top - height - self.DROP_GAP
+                continue
+            x, y, w, h, _ = placed
+            yield box_x + x, bottom - y - h - self.DROP_GAP
+
+    @staticmethod
+    def _turned_size(rect, angle):
+        """Ширина и высота коробки, повёрнутой на угол, кратный 90 градусам."""
+        if angle is not None and round(2 * angle / math.pi) % 2 == 1:
+            return rect.height, rect.width
+        return rect.width, rect.height
+
+    def _add_body(self, x, y, obj, angle=None, rect=None):
+        """
+        :param x, y: левый верхний угол коробки (уже с учётом поворота на angle)
+        :param angle: если задан, коробка создаётся под этим углом и не вращается
+        :param rect: размеры тела, если они отличаются от obj.rect
+        """
+        rect = obj.rect if rect is None else rect
+        width, height = self._turned_size(rect, angle)
+
+        mass = 0.1
+        inertia = pymunk.moment_for_box(mass, (rect.width, rect.height))
+        body = pymunk.Body(mass, inertia)
+        body.position = (x + width / 2, y + height / 2)
+
+        shape = pymunk.Poly.create_box(body, (rect.width, rect.height))
+        shape.friction = 0
+        shape.elasticity = 0
+        shape.source_object = obj
+
+        self.space.add(body, shape)
+        self._shape_index[shape] = len(self.rectangles)
+        self.rectangles.append((rect, body, shape))
+        if angle is not None:
+            self._lock_angle(body, angle)
+
+    def apply_poses(self, rect_obj, poses):
+        """
+        Переставляет коробки в готовые положения (например, найденные OrientationSearch) и запрещает
+        им вращаться. Этапа поворота после этого нет.
+
+        :param poses: массив (N, 3) x, y, angle в порядке rect_obj
+        """
+        pose_by_id = {id(obj): pose for obj, pose in zip(rect_obj, poses)}
+        for _, body, shape in self.rectangles:
+            x, y, angle = pose_by_id[id(shape.source_object)]
+            body.position = (x, y)
+            body.velocity = (0, 0)
+            self._lock_angle(body, angle)
+        self.rotation_done = True
+        self._after_rotation()
+
+    def _tune_spatial_hash(self):
+        # Ячейка порядка типичной коробки: большинство коробок попадает в 1–4 ячейки,
+        # а в ячейке оказывается лишь несколько соседей. Размер таблицы ~10 на фигуру, как советует Chipmunk
+        if not self.rectangles:
+            return
+        sizes = np.array([(rect.width, rect.height) for rect, _, _ in self.rectangles])
+        dim = float(np.median(sizes.max(axis=1)))
+        self.space.use_spatial_hash(dim, 10 * len(self.space.shapes))
+
+    def get_colliding_pairs(self, include_walls=True) -> np.ndarray:
+        """
+        Касающиеся или пересекающиеся пары: коробка-коробка и, как раньше, коробка-стенка.
+        Кандидаты берутся из пространственного индекса пространства, точная проверка — только для них.
+        В отличие от прежнего списка пар фигур возвращаются индексы.
+
+        :return: массив (K, 2): (i, j) с i < j — коробки rectangles[i] и rectangles[j];
+                 (i, j) с j < 0 — коробка i и стенка walls[-j - 1]
+        """
+        wall_index = {wall: -k - 1 for k, wall in enumerate(self.walls)} if include_walls else {}
+        pairs = []
+        for i, (_, _, shape) in enumerate(self.rectangles):
+            for info in self.space.shape_query(shape):
+                if not info.contact_point_set.points:
+                    continue
+                j = self._shape_index.get(info.shape)
+                if j is None:
+                    j = wall_index.get(info.shape)
+                    if j is not None:
+                        pairs.append((i, j))
+                elif j > i:
+                    pairs.append((i, j))
+        return np.array(pairs, dtype=np.int32).reshape(-1, 2)
 
     def update(self, dt):
+        settled = self.is_settled()
+        self._advance_rotation(settled)
+        self.settled = self.rotation_done and settled
+
+        # Свободное место пересчитываем, только когда куча успокоилась и что-то сдвинулось с прошлого анализа
+        self._frames += 1
+        if self.rotation_done and settled and self._frames >= self._next_refresh:
+            if self.refresh_empty_areas():
+                self._next_refresh = self._frames + self.REFRESH_FRAMES
+
+        self._step(dt)
+
+    def run_until_rest(self, max_steps=20000, dt=1 / 60) -> np.ndarray:
+        """
+        Безоконный режим: шагает пространство в цикле, без отрисовки, пока коробки не повернутся
+        и не успокоятся или пока не кончится бюджет шагов. Покой проверяется так же, как в update,
+        раз в speed_multiplier шагов.
+
+        :return: итоговые положения коробок, как у get_poses
+        """
+        steps = 0
+        # Сначала шаг: до него тела неподвижны, и покой был бы обнаружен сразу
+        while steps < max_steps:
+            self._step(dt)
+            steps += self.speed_multiplier
+            settled = self.is_settled()
+            if self.rotation_done and settled:
+                break
+            self._advance_rotation(settled)
+
+        self.steps_taken = steps
+        return self.get_poses()
+
+    def is_settled(self):
+        """
+        Куча в покое, если суммарная кинетическая энергия бодрствующих тел меньше, чем если бы каждое из них
+        было самой лёгкой коробкой, движущейся со скоростью IDLE_SPEED: в среднем тела не быстрее прежнего
+        порога на одно тело, и строгость проверки не растёт с размером кучи.
+        Уснувшие тела не считаются ни здесь, ни решателем (скорость в момент засыпания у них сохраняется).
+        Первые SETTLE_STEPS шагов после создания тел или поворота на месте покоем не считаются,
+        следующие RESOLVE_STEPS — только если не осталось пересечений глубже MAX_PENETRATION.
+        """
+        if self._space_steps < self._settle_after:
+            return False
+        awake = [body for _, body, _ in self.rectangles if not body.is_sleeping]
+        energy = np.fromiter((body.kinetic_energy for body in awake), dtype=np.float64, count=len(awake)).sum()
+        # pymunk считает энергию как m·v², без 1/2
+        if awake and energy >= len(awake) * self._min_mass * self.IDLE_SPEED ** 2:
+            return False
+        if self._space_steps < self._settle_after + self.RESOLVE_STEPS and \
+                self.max_penetration() > self.MAX_PENETRATION:
+            # Уснувшие тела решатель не расталкивает
+            for _, body, _ in self.rectangles:
+                body.activate()
+            return False
+        return True
 
-        all = 0
-        for tracker in self.trackers:
-            if not tracker.is_stationary():
-                all += 1
-            tracker.update()
-
-        if all == 0 and not self.rotation_done:
+    def _advance_rotation(self, settled):
+        if settled and not self.rotation_done:
             if self.rotation_index < len(self.rectangles):
-                rect, body, shape = self.rectangles[self.rotation_index]
-
                 # Повернуть на 90 градусов
-                body.angle = math.pi / 2
-                body.angular_velocity = 0
-
-                # Запретить вращение
-                body.moment = float("inf")
-                self.space.reindex_shapes_for_body(body)
+                self._rotate_in_place(self.rotation_index, math.pi / 2)
+                self._after_rotation()
 
                 self.rotation_index += 1
             else:
                 self.rotation_done = True
 
-        if self.rotation_done:
-            self.empty_areas = find_empty_areas(self.get_parent_image())
-
+    def _lock_angle(self, body, angle):
+        body.activate()
+        body.angle = angle
+        body.angular_velocity = 0
+
+        # Запретить вращение
+        body.moment = float("inf")
+        self.space.reindex_shapes_for_body(body)
+
+    def _rotate_in_place(self, index, angle):
+        """
+        Поворачивает коробку вокруг центра. Если повёрнутая коробка врезалась в соседей или стенку,
+        она переносится поверх кучи и падает заново: решатель такие пересечения не разбирает
+        (ряд, ставший шире ящика, расталкивается только по горизонтали и застревает навсегда).
+        """
+        rect, body, shape = self.rectangles[index]
+        self._lock_angle(body, angle)
+        if self._shape_penetration(shape) <= self.ROTATION_CLEARANCE:
+            return
+
+        _, box_y, _, box_h = self.box_rect
+        others = np.delete(self.get_polygons(), index, axis=0)
+        top = others[..., 1].min() if len(others) else box_y + box_h
+        _, height = self._turned_size(rect, angle)
+        body.position = (body.position.x, top - height / 2 - self.DROP_GAP)
+        body.velocity = (0, 0)
+        self.space.reindex_shapes_for_body(body)
+
+    def _after_rotation(self):
+        # Будим всех: спящие тела решатель не двигает, и соседи не заметили бы изменившейся кучи.
+        # И даём решателю время, прежде чем снова проверять покой
+        for _, body, _ in self.rectangles:
+            body.activate()
+        self._settle_after = self._space_steps + self.SETTLE_STEPS
+
+    def _shape_penetration(self, shape) -> float:
+        worst = 0.0
+        for info in self.space.shape_query(shape):
+            for point in info.contact_point_set.points:
+                worst = max(worst, -point.distance)
+        return worst
+
+    def max_penetration(self) -> float:
+        """Наибольшая глубина пересечения коробки с коробкой или стенкой, в пикселях (0 — пересечений нет)."""
+        return max((self._shape_penetration(shape) for _, _, shape in self.rectangles), default=0.0)
+
+    def _step(self, dt):
         for _ in range(self.speed_multiplier):
             # if self.shake_timer > 0:
             #     if self.shake_timer < 2:
@@ -125,6 +373,7 @@ class PhysicsEngine:
             #         self._shake(strength=5)
             #     self.shake_timer -= dt
             self.space.step(dt)
+        self._space_steps += self.speed_multiplier
 
     def _shake(self, strength=10000):
         for body in self.space.bodies:
@@ -139,9 +388,143 @@ class PhysicsEngine:
     def get_segments(self):
         return [s for s in self.space.shapes if isinstance(s, pymunk.Segment)]
 
-    def get_parent_image(self):
-        surface = self.parent._render()
-        surf_array = pygame.surfarray.array3d(surface)  # shape: (width, height, 3)
-        image_np = np.transpose(surf_array, (1, 0, 2))  # shape: (height, width, 3)
+    def get_polygons(self) -> np.ndarray:
+        """Вершины всех коробок в мировых координатах, массив (N, 4, 2)."""
+        if not self.rectangles:
+            return np.zeros((0, 4, 2))
+        return np.array([[body.local_to_world(v) for v in shape.get_vertices()]
+                         for _, body, shape in self.rectangles])
+
+    def packing_density(self) -> float:
+        """Доля площади от дна ящика до верха кучи, занятая коробками."""
+        if not self.rectangles:
+            return 0.0
+        x, y, w, h = self.occupancy.x, self.occupancy.y, self.occupancy.width, self.occupancy.height
+        pile_height = y + h - self.get_polygons()[..., 1].min()
+        area = sum(rect.width * rect.height for rect, _, _ in self.rectangles)
+        return area / (w * max(pile_height, 1))
+
+    def get_poses(self) -> np.ndarray:
+        """Положения коробок, массив (N, 3): x, y, angle."""
+        return np.array([(body.position.x, body.position.y, body.angle) for _, body, _ in self.rectangles],
+                        dtype=np.float64).reshape(-1, 3)
+
+    def find_empty_areas(self):
+        self.occupancy.rasterize(self.get_polygons())
+        return self.occupancy.empty_areas()
+
+    def refresh_empty_areas(self):
+        """
+        Обновляет empty_areas, если с прошлого анализа сдвинулась хотя бы одна коробка, то есть
+        изменилась хотя бы одна из её вершин в пикселях. Перерисовывается и пересчитывается только область,
+        которую сдвинувшиеся коробки занимали до и после.
+
+        :return: было ли что-то пересчитано
+        """
+        polygons = np.rint(self.get_polygons())
+
+        if self._analysed_polygons is None or len(polygons) != len(self._analysed_polygons):
+            self.occupancy.rasterize(polygons)
+            self.empty_areas = self.occupancy.empty_areas()
+        else:
+            moved = (polygons != self._analysed_polygons).any(axis=(1, 2))
+            if not moved.any():
+                return False
+
+            changed = np.concatenate([polygons[moved], self._analysed_polygons[moved]]).reshape(-1, 2)
+            region = (*changed.min(axis=0), *(changed.max(axis=0) + 1))
+            self.occupancy.rasterize(polygons, region)
+            self.empty_areas = self.occupancy.empty_areas(region=region)
+
+        self._analysed_polygons = polygons
+        return True
+
 
-        return image_np
+    def snapshot(self) -> np.ndarray:
+        """Состояние всех коробок в порядке rectangles, массив BODY_DTYPE."""
+        state = np.empty(len(self.rectangles), dtype=BODY_DTYPE)
+        for i, (rect, body, _) in enumerate(self.rectangles):
+            state[i] = (rect.width, rect.height, body.position.x, body.position.y, body.angle,
+                        body.velocity.x, body.velocity.y, body.angular_velocity, body.mass, body.moment)
+        return state
+
+    def get_sources(self) -> list:
+        return [shape.source_object for _, _, shape in self.rectangles]
+
+    @classmethod
+    def from_snapshot(cls, box_rect, state: np.ndarray, rect_obj, speed_multiplier=1) -> 'PhysicsEngine':
+        """
+        Новое пространство с телами из снимка. Поворотов после восстановления не будет: снимок
+        обычно берётся у уже уложенной кучи. Накопленные контакты решателя не сохраняются,
+        поэтому первые шаги после восстановления могут слегка отличаться от исходной симуляции.
+
+        :param rect_obj: исходные объекты коробок в порядке снимка (get_sources()); размеры тел
+                         берутся из снимка, объекты только привязываются к телам
+        """
+        engine = cls(box_rect, speed_multiplier)
+        engine.rotation_done = True
+
+        for record, obj in zip(state, rect_obj):
+            engine._add_body(0, 0, obj, rect=_BoxSize(record['w'], record['h']))
+            body = engine.rectangles[-1][1]
+            body.position = (record['x'], record['y'])
+            body.angle = record['angle']
+            body.velocity = (record['vx'], record['vy'])
+            body.angular_velocity = record['angular_velocity']
+            body.mass = record['mass']
+            body.moment = record['moment']
+
+        engine._tune_spatial_hash()
+        engine._min_mass = min((body.mass for _, body, _ in engine.rectangles), default=0)
+        return engine
+
+    def branch(self) -> 'PhysicsEngine':
+        return PhysicsEngine.from_snapshot(self.box_rect, self.snapshot(), self.get_sources(), self.speed_multiplier)
+
+    def drop(self, obj, x, angle=None):
+        """
+        Бросает новую коробку левым краем в x прямо над верхом кучи.
+
+        :param angle: если задан, коробка ставится под этим углом и не вращается
+        """
+        rect = obj.rect
+        turned = angle is not None and round(2 * angle / math.pi) % 2 == 1
+        width, height = (rect.height, rect.width) if turned else (rect.width, rect.height)
+
+        box_x, box_y, box_w, box_h = self.box_rect
+        top = self.get_polygons()[..., 1].min() if self.rectangles else box_y + box_h
+        x = min(max(x, box_x), box_x + box_w - width)
+
+        self._add_body(0, 0, obj)
+        body = self.rectangles[-1][1]
+        body.position = (x + width / 2, top - height / 2 - 1)
+        if angle is not None:
+            self._lock_angle(body, angle)
+        self._min_mass = min(self._min_mass or body.mass, body.mass)
+
+    def rollout(self, obj, x, angle=None, max_steps=20000, dt=1 / 60):
+        """
+        "Что будет, если бросить эту коробку сюда": ветвит текущее состояние, бросает коробку и ждёт покоя.
+        Само состояние движка не меняется.
+
+        :return: (положения всех коробок, включая новую последней; плотность кучи)
+        """
+        engine = self.branch()
+        engine.drop(obj, x, angle)
+        poses = engine.run_until_rest(max_steps, dt)
+        return poses, engine.packing_density()
+
+
+def simulate(box_rect, rect_obj, max_steps=20000, dt=1 / 60, speed_multiplier=10) -> np.ndarray:
+    """
+    Физическая укладка без окна: бросает коробки в ящик и возвращает их положения в покое.
+
+    :param rect_obj: объекты с полем rect (как у add_rects)
+    :return: массив (N, 3) x, y, angle центров коробок в порядке rect_obj
+    """
+    engine = PhysicsEngine(box_rect, speed_multiplier)
+    engine.add_rects(rect_obj)
+    poses = engine.run_until_rest(max_steps, dt)
+
+    index = {id(shape.source_object): i for i, (_, _, shape) in enumerate(engine.rectangles)}
+    return poses[[index[id(obj)] for obj in rect_obj]]
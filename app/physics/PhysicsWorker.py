@@ -0,0 +1,73 @@
+import threading
+import time
+
+import numpy as np
+
+from app.physics.PhysicsEngine import PhysicsEngine
+
+
+class PhysicsSnapshot:
+    def __init__(self, tick, poses, empty_areas, settled):
+        self.tick = tick
+        self.poses = poses
+        self.empty_areas = empty_areas
+        self.settled = settled
+
+
+class PhysicsWorker:
+    """
+    Шагает PhysicsEngine в отдельном потоке с фиксированным шагом и публикует снимки положений.
+    Двойной буфер: снимок собирается целиком в заднем буфере, затем одной операцией присваивания
+    становится передним. Опубликованный снимок больше не меняется (массив только для чтения),
+    поэтому отрисовка читает его без блокировок.
+    """
+
+    def __init__(self, engine: PhysicsEngine, dt=1 / 60):
+        self.engine = engine
+        self.dt = dt
+
+        self._front = PhysicsSnapshot(0, self._freeze(engine.get_poses()), (), False)
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def snapshot(self) -> PhysicsSnapshot:
+        return self._front
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        tick = self._front.tick
+        next_time = time.perf_counter()
+        while not self._stop.is_set():
+            self.engine.update(self.dt)
+            tick += 1
+
+            back = PhysicsSnapshot(tick, self._freeze(self.engine.get_poses()), tuple(self.engine.empty_areas),
+                                   self.engine.settled)
+            self._front = back
+
+            # Держим темп реального времени; если шаг дольше dt, догоняем без сна
+            next_time += self.dt
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_time = time.perf_counter()
+
+    @staticmethod
+    def _freeze(poses: np.ndarray) -> np.ndarray:
+        poses.flags.writeable = False
+        return poses
@@ -8,11 +8,13 @@ from pygame_gui import elements
 
 from app.AppContext import AppContext
 from app.common import Colors
+from app.common.ItemGenerator import record_sizes
 from app.custom_elements.ButtonsPanel import ButtonsPanel
 from app.custom_elements.DrawableRect import DrawableRect
 from app.custom_elements.StorageBox import StorageBox
 from app.custom_elements.Workspace import Workspace
-from app.packers.NFDHPacker import NFDHPacker
+from app.packers.OnlinePacker import OnlinePacker
+from app.packers.Packers import create_packer, next_packer_name
 from app.screens.PhysScreen import PhysScreen
 from app.screens.base.ScreenBase import ScreenBase
 from camera.CameraController import CameraController, ActionState
@@ -25,6 +27,11 @@ class MainScreen(ScreenBase):
         self._init_ui_elements()
 
         self.cam_fixed = False
+        self.packer = None
+        # В превью результат кнопки «Разместить»: онлайн-упаковка его не перезаписывает до отпускания кадра
+        self.showing_packed = False
+        self.last_result_frame_id = 0
+        self.frame_ref = None
 
         self.camera_controller: CameraController = self.context.camera_controller
         self.camera_controller.on_camera_connected.append(self._on_camera_connected)
@@ -71,6 +78,7 @@ class MainScreen(ScreenBase):
         new_storage = pygame.Rect(new_workspace.right + gap, (screen_h - storage_height) // 2, box_width,
                                   storage_height)
         self.storage_box.update_rect(new_storage)
+        self.online_packer = OnlinePacker(*new_storage.size, self.config.allow_rotation)
 
         new_buttons = pygame.Rect(new_storage.right + gap, 0, panel_width, screen_h)
         self.buttons_panel.rect.update(new_buttons)
@@ -98,10 +106,14 @@ class MainScreen(ScreenBase):
             "подождите.."
         )
         fix_cam_button_message = "Отпустить" if self.cam_fixed else "Зафиксировать"
+        packer_button_message = f"Алгоритм: {self.config.packer_name}"
+        bin_button_message = f"Ящик {self.storage_box.bin_index + 1}/{self.storage_box.bin_count}"
 
         self.buttons_panel.camera_button.set_text(cam_button_message)
         self.buttons_panel.process_button.set_text(process_button_message)
         self.buttons_panel.fix_cam_button.set_text(fix_cam_button_message)
+        self.buttons_panel.packer_button.set_text(packer_button_message)
+        self.buttons_panel.bin_button.set_text(bin_button_message)
 
         if self.camera_controller.capturing == ActionState.STARTED:
             self.buttons_panel.process_button.enable()
@@ -116,7 +128,12 @@ class MainScreen(ScreenBase):
         if self.cam_fixed:
             return
 
-        self.workspace.camera_frame = self.camera_controller.get_frame()
+        # Держим закреплённым только кадр, который сейчас показываем
+        frame_ref = self.camera_controller.acquire_frame()
+        if self.frame_ref is not None:
+            self.frame_ref.release()
+        self.frame_ref = frame_ref
+        self.workspace.camera_frame = None if frame_ref is None else frame_ref.array
 
         if self.camera_controller.processing.STARTED:
             self.update_camera_process_result()
@@ -127,6 +144,23 @@ class MainScreen(ScreenBase):
         aruco_markers = self.camera_controller.get_markers()
         self.workspace.detected_markers = aruco_markers
 
+        # Онлайн-упаковку двигаем только по новым результатам детекции, а не на каждом кадре интерфейса
+        result = self.camera_controller.get_result()
+        if result is None or result.frame_id == self.last_result_frame_id:
+            return
+        self.last_result_frame_id = result.frame_id
+
+        if self.config.online_packing:
+            detected = [cv2.minAreaRect(box)[:2] for box in result.boxes if box is not None]
+            if self.online_packer.sync(detected) and not self.showing_packed:
+                self.show_online_placement()
+
+    def show_online_placement(self):
+        self.showing_packed = False
+        self.storage_box.placeables = self.online_packer.get_placed()
+        # Онлайн-упаковка всегда в одном ящике
+        self.storage_box.bin_index = 0
+
     def cut_rect(self, frame, rect):
         center = rect[0]
         size = rect[1]
@@ -158,6 +192,10 @@ class MainScreen(ScreenBase):
             self.workspace.create_random_items(10)
         elif event.ui_element == self.buttons_panel.place_button:
             self.place_to_box()
+        elif event.ui_element == self.buttons_panel.packer_button:
+            self.config.packer_name = next_packer_name(self.config.packer_name)
+        elif event.ui_element == self.buttons_panel.bin_button:
+            self.storage_box.next_bin()
         elif event.ui_element == self.buttons_panel.place_phys_button:
             self.place_phys()
 
@@ -181,7 +219,16 @@ class MainScreen(ScreenBase):
         self.cam_fixed = not self.cam_fixed
         if not self.cam_fixed:
             self.workspace.detected_boxes = []
+            if self.showing_packed and self.config.online_packing:
+                self.show_online_placement()
         else:
+            # Зафиксированный кадр живёт дольше буфера кольца — забираем копию и отпускаем буфер
+            if self.workspace.camera_frame is not None:
+                self.workspace.camera_frame = self.workspace.camera_frame.copy()
+            if self.frame_ref is not None:
+                self.frame_ref.release()
+                self.frame_ref = None
+
             boxes = [cv2.minAreaRect(box) for box in self.workspace.boxes]
             self.workspace.detected_boxes = [
                 DrawableRect(pygame.Rect(x, y, w, h), angle,
@@ -190,19 +237,33 @@ class MainScreen(ScreenBase):
 
             self.workspace.generated_boxes = []
 
+            if self.config.sizes_record_path is not None:
+                record_sizes(self.config.sizes_record_path, [size for _, size, _ in boxes])
+
     def place_to_box(self):
-        packer = NFDHPacker(*self.storage_box.rect.size)
+        if self.packer is not None:
+            self.packer.cancel()
+
         boxes_to_pack = self.workspace.detected_boxes if len(self.workspace.detected_boxes) > 0 \
             else self.workspace.generated_boxes
+        self.packer = create_packer(self.config.packer_name, *self.storage_box.rect.size, self.config.allow_rotation,
+                                    self.config.multi_bin, boxes_to_pack)
 
-        packer.start(boxes_to_pack, self._on_packing_completed)
+        self.packer.start(boxes_to_pack, self._on_packing_completed)
 
     def place_phys(self):
+        # Экран уходит, а update, отпускавший кадр при смене, больше не вызовется
+        if self.frame_ref is not None:
+            self.frame_ref.release()
+            self.frame_ref = None
+        self.workspace.camera_frame = None
         self.screen_manager.switch_to(PhysScreen, self.config.box_width, self.config.box_height,
                                       self.workspace.generated_boxes)
 
     def _on_packing_completed(self, packed):
+        self.showing_packed = True
         self.storage_box.placeables = packed
+        self.storage_box.bin_index = 0
 
     def _on_camera_connected(self):
         resolution = self.camera_controller.get_camera_resolution()
@@ -1,9 +1,12 @@
 import copy
+import threading
 from pygame_gui import elements
 
 from app.common import Colors
 from app.screens.base.ScreenBase import ScreenBase
+from app.physics.OrientationSearch import OrientationSearch
 from app.physics.PhysicsEngine import PhysicsEngine
+from app.physics.PhysicsWorker import PhysicsWorker
 import pygame
 import math
 
@@ -20,8 +23,22 @@ class PhysScreen(ScreenBase):
         self.storage = pygame.Rect(0, context.surface.get_height() - self.scaled_height, self.scaled_width,
                                    self.scaled_height)
 
-        self.engine = PhysicsEngine(self.storage, self, 10)
+        self.engine = PhysicsEngine(self.storage, 10)
         self.engine.add_rects(rects)
+        # После запуска воркера пространство трогает только он; экрану нужны неизменные части и снимки
+        self.bodies = [(rect, shape.source_object) for rect, _, shape in self.engine.get_drawable_objects()]
+        self.segments = [((int(s.a.x), int(s.a.y)), (int(s.b.x), int(s.b.y))) for s in self.engine.get_segments()]
+
+        self.worker = PhysicsWorker(self.engine)
+        if not self.config.orientation_search:
+            self.worker.start()
+
+        self.rects = rects
+        self._closed = False
+        self._lock = threading.Lock()
+        if self.config.orientation_search:
+            OrientationSearch(self.storage).start(rects, self._on_orientations_found)
+        self.snapshot = self.worker.snapshot
 
         self.placed_rects = []
 
@@ -31,47 +48,62 @@ class PhysScreen(ScreenBase):
             manager=self.ui_manager)
 
     def update(self, dt):
-        self.engine.update(dt)
+        snapshot = self.worker.snapshot
+        if snapshot is self.snapshot and self.placed_rects:
+            return
+        self.snapshot = snapshot
+
         self.placed_rects = []
-        for rect, body, shape in self.engine.get_drawable_objects():
+        for (rect, source), (x, y, angle) in zip(self.bodies, snapshot.poses):
             surface = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-            angle_degrees = -body.angle * 180 / math.pi
+            angle_degrees = -angle * 180 / math.pi
             rotated = pygame.transform.rotate(surface, angle_degrees)
-            rotated_rect = rotated.get_rect(center=(int(body.position.x), int(body.position.y)))
+            rotated_rect = rotated.get_rect(center=(int(x), int(y)))
 
-            new_rect = copy.deepcopy(shape.source_object)
+            new_rect = copy.deepcopy(source)
             new_rect.rect = rotated_rect
             self.placed_rects.append(new_rect)
 
     def draw(self):
         self.surface.fill(Colors.WHITE)
         self.surface.blit(self._render(), (self.surface.width / 2 - self.scaled_width / 2, 0))
-        for x, y, w, h in self.engine.empty_areas:
+        for x, y, w, h in self.snapshot.empty_areas:
             pygame.draw.rect(self.surface, (255, 0, 0), (self.surface.width / 2 - self.scaled_width / 2 + x, y, w, h), 2)
 
     def _render(self):
         self.subsurface.fill(Colors.WHITE)
 
-        for seg in self.engine.get_segments():
-            start = int(seg.a.x), int(seg.a.y)
-            end = int(seg.b.x), int(seg.b.y)
+        for start, end in self.segments:
             pygame.draw.line(self.subsurface, (23, 22, 110), start, end, 3)
 
-        for rect, body, shape in self.engine.get_drawable_objects():
+        for (rect, source), (x, y, angle) in zip(self.bodies, self.snapshot.poses):
             surface = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-            surface.fill(shape.source_object.back_color)
-            angle_degrees = -body.angle * 180 / math.pi
+            surface.fill(source.back_color)
+            angle_degrees = -angle * 180 / math.pi
             rotated = pygame.transform.rotate(surface, angle_degrees)
-            rotated_rect = rotated.get_rect(center=(int(body.position.x), int(body.position.y)))
+            rotated_rect = rotated.get_rect(center=(int(x), int(y)))
             self.subsurface.blit(rotated, rotated_rect)
 
         pygame.draw.rect(self.subsurface, Colors.RED, self.storage, width=2)
 
         return self.subsurface
 
+    def _on_orientations_found(self, result):
+        # Вызывается из потока поиска. Пока поиск идёт, воркер не запущен и коробки не поворачиваются
+        # по одной; найденная укладка ставится целиком, и физика только продолжает с неё
+        with self._lock:
+            if self._closed:
+                return
+            if result is not None:
+                self.engine.apply_poses(self.rects, result.poses)
+            self.worker.start()
+
     def handle_event(self, event):
         from app.screens.MainScreen import MainScreen
         if event.ui_element == self.back_button:
+            with self._lock:
+                self._closed = True
+                self.worker.stop()
             self.screen_manager.switch_to(MainScreen)
 
 # import copy
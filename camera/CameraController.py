@@ -1,14 +1,20 @@
 import threading
 import time
 from enum import Enum
+from typing import TYPE_CHECKING
 
 import cv2
 import numpy
 import numpy as np
 
 from app.AppConfig import AppConfig
+from camera.DetectionWorker import DetectionWorker
+from camera.FrameRing import FrameRing, FrameRef
+from camera.RegionOfInterest import RegionOfInterest
 from camera.detectors.ArucoDetector import ArucoBoxDetector, ArucoResult
-from camera.detectors.YoloBoxDetector import YoloBoxDetector
+
+if TYPE_CHECKING:
+    from camera.detectors.YoloBoxDetector import YoloBoxDetector
 
 
 class ActionState(Enum):
@@ -18,20 +24,59 @@ class ActionState(Enum):
     STOPPING = 3
 
 
+class DetectionResult:
+    def __init__(self, frame_id, captured_at, boxes, markers, completed_at):
+        self.frame_id = frame_id
+        self.captured_at = captured_at
+        self.boxes = boxes
+        self.markers = markers
+        self.completed_at = completed_at
+
+    @property
+    def latency(self) -> float:
+        """Секунды от получения кадра с камеры до готового результата."""
+        return self.completed_at - self.captured_at
+
+
 class CameraController:
-    def __init__(self, video_source):
+    # Пауза после неудачного чтения кадра растёт вдвое до предела и сбрасывается после удачного
+    READ_RETRY_DELAY = 0.01
+    MAX_READ_RETRY_DELAY = 0.5
+    # Как часто ждущий кадра поток обработки перепроверяет, не пора ли остановиться
+    FRAME_WAIT_TIMEOUT = 0.5
+
+    def __init__(self, video_source, detection_in_process=False, inference_size: int | None = 640,
+                 detection_roi=None):
+        """
+        :param detection_roi: где искать коробки — "markers" (по маркерам ArUco), (x, y, w, h) или None (весь кадр)
+        """
         self.capturing = ActionState.STOPPED
         self.processing = ActionState.STOPPED
 
         self._video_source = video_source
         self.cap: cv2.VideoCapture | None = None
-        self.boxes_detector = YoloBoxDetector()
-        self.aruco_detector = ArucoBoxDetector(AppConfig.ARUCO_MARKER_REAL_SIZE, AppConfig.ARUCO_DICT)
+        # В отдельном процессе детекторы создаются там, здесь ни модель, ни torch не загружаются:
+        # модуль YoloBoxDetector импортируется только для детекции в потоке
+        self.detection_worker = DetectionWorker(AppConfig.ARUCO_MARKER_REAL_SIZE, AppConfig.ARUCO_DICT,
+                                                inference_size, detection_roi) if detection_in_process else None
+        self.boxes_detector = None
+        if not detection_in_process:
+            from camera.detectors.YoloBoxDetector import YoloBoxDetector
+            self.boxes_detector = YoloBoxDetector(imgsz=inference_size)
+        self.aruco_detector = None if detection_in_process else \
+            ArucoBoxDetector(AppConfig.ARUCO_MARKER_REAL_SIZE, AppConfig.ARUCO_DICT)
+        self.roi = None if detection_in_process or detection_roi is None else RegionOfInterest(detection_roi)
 
         self.lock = threading.Lock()
-        self.latest_frame: numpy.ndarray | None = None
+        # Оповещает поток обработки о новом кадре; работает под тем же замком, что и frame_id
+        self.new_frame = threading.Condition(self.lock)
+        self.frames = FrameRing()
+        # Номер (поколение в кольце) растёт монотонно с каждым удачным чтением, 0 — кадров ещё не было
+        self.frame_id = 0
+        self.frame_time = 0.0
         self.detected_boxes = []
         self.detected_markers: list[ArucoResult] = []
+        self.result: DetectionResult | None = None
 
         self.capture_thread = None
         self.processing_thread = None
@@ -52,6 +97,10 @@ class CameraController:
         if self.capturing != ActionState.STARTED:
             return
         self.processing = ActionState.STARTING
+        if self.detection_worker is not None:
+            self.detection_worker.start()
+        if self.roi is not None:
+            self.roi.reset()
         self.processing_thread = threading.Thread(target=self._processing_loop, daemon=True)
         self.processing_thread.start()
 
@@ -59,9 +108,14 @@ class CameraController:
         if self.processing != ActionState.STARTED:
             return
         self.processing = ActionState.STOPPING
+        with self.new_frame:
+            self.new_frame.notify_all()
         self.processing_thread.join()
+        if self.detection_worker is not None:
+            self.detection_worker.stop()
         self.detected_boxes = []
         self.detected_markers = []
+        self.result = None
         self.processing = ActionState.STOPPED
 
     def stop(self):
@@ -70,7 +124,7 @@ class CameraController:
         self.capturing = ActionState.STOPPING
         self.capture_thread.join()
         self.cap.release()
-        self.latest_frame = None
+        self.frames.clear()
         self.capturing = ActionState.STOPPED
 
     def get_camera_resolution(self) -> tuple[int, int] | None:
@@ -81,10 +135,16 @@ class CameraController:
         return None
 
     def get_frame(self) -> numpy.ndarray | None:
-        with self.lock:
-            if self.latest_frame is not None:
-                return self.latest_frame.copy()
+        """Копия последнего кадра: буфер закрепляется только на время копирования."""
+        frame_ref = self.frames.acquire()
+        if frame_ref is None:
             return None
+        with frame_ref:
+            return frame_ref.array.copy()
+
+    def acquire_frame(self) -> FrameRef | None:
+        """Последний кадр, закреплённый до release(): захват не пишет в его буфер."""
+        return self.frames.acquire()
 
     def get_boxes(self) -> list:
         with self.lock:
@@ -94,6 +154,10 @@ class CameraController:
         with self.lock:
             return self.detected_markers.copy()
 
+    def get_result(self) -> DetectionResult | None:
+        with self.lock:
+            return self.result
+
     def _try_connect_camera(self, on_connected_callbacks, max_retries=5, delay=2):
         self.connection_status = "Подключение к камере..."
         for i in range(max_retries):
@@ -115,36 +179,97 @@ class CameraController:
 
     def _capture_loop(self):
         self.capturing = ActionState.STARTED
+        retry_delay = self.READ_RETRY_DELAY
         while self.capturing == ActionState.STARTED:
-            ret, frame = self.cap.read()
+            slot = self.frames.write_buffer(self.FRAME_WAIT_TIMEOUT)
+            if slot is None:
+                # Все буферы держат читатели; заодно снова проверяем, не остановлен ли захват
+                continue
+            index, buffer = slot
+            ret, frame = self.cap.read() if buffer is None else self.cap.read(image=buffer)
             if not ret:
+                time.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, self.MAX_READ_RETRY_DELAY)
                 continue
+            retry_delay = self.READ_RETRY_DELAY
 
-            with self.lock:
-                self.latest_frame = frame
+            with self.new_frame:
+                self.frame_id = self.frames.commit(index, frame)
+                self.frame_time = time.perf_counter()
+                self.new_frame.notify_all()
 
     def _processing_loop(self):
         self.processing = ActionState.STARTED
+        last_frame_id = 0
         while self.processing == ActionState.STARTED:
-            frame = None
+            with self.new_frame:
+                # Ждём именно нового кадра: повторная детекция на том же кадре ничего не даёт
+                self.new_frame.wait_for(lambda: self.frame_id != last_frame_id
+                                                or self.processing != ActionState.STARTED,
+                                        timeout=self.FRAME_WAIT_TIMEOUT)
+                if self.frame_id == last_frame_id:
+                    continue
+                frame_ref, last_frame_id, captured_at = self.frames.acquire(), self.frame_id, self.frame_time
+            if frame_ref is None:
+                continue
 
+            # Кадр закреплён на время детекции, захват пишет в другие буферы кольца
+            with frame_ref:
+                if self.detection_worker is not None:
+                    try:
+                        boxes_filtered, detected_markers = self.detection_worker.detect(frame_ref.array,
+                                                                                        last_frame_id)
+                    except RuntimeError as e:
+                        # Процесс детекции упал: останавливаем его, чтобы обработку можно было запустить заново
+                        self._abort_processing(f"Ошибка детекции: {e}")
+                        return
+                else:
+                    boxes_filtered, detected_markers = self.detect_frame(self.boxes_detector, self.aruco_detector,
+                                                                         frame_ref.array, self.roi)
+
+            result = DetectionResult(last_frame_id, captured_at, boxes_filtered, detected_markers,
+                                     time.perf_counter())
             with self.lock:
-                if self.latest_frame is not None:
-                    frame = self.latest_frame
+                self.detected_boxes = boxes_filtered
+                self.detected_markers = detected_markers
+                self.result = result
 
-            if frame is not None:
-                detected_boxes = self.boxes_detector.detect(frame)
-                detected_markers = self.aruco_detector.detect(frame)
+    def _abort_processing(self, status: str):
+        self.detection_worker.stop()
+        with self.lock:
+            self.detected_boxes = []
+            self.detected_markers = []
+            self.result = None
+        self.connection_status = status
+        self.processing = ActionState.STOPPED
 
-                boxes_filtered = self.filter_by_overlap(detected_boxes, [m.bounding_box for m in detected_markers])
-                with self.lock:
-                    self.detected_boxes = boxes_filtered
-                    self.detected_markers = detected_markers
+    @staticmethod
+    def detect_frame(boxes_detector: 'YoloBoxDetector', aruco_detector: ArucoBoxDetector, frame: np.ndarray,
+                     roi: RegionOfInterest | None = None) -> tuple[list, list[ArucoResult]]:
+        """
+        Детекция одного кадра; общая для потока обработки и процесса DetectionWorker.
+        С roi оба детектора видят только вырез рабочей зоны, результаты возвращаются в координатах кадра.
+        """
+        region = None if roi is None else roi.update(frame, aruco_detector)
+        if region is None:
+            # Маска без контура даёт None вместо коробки
+            detected_boxes = [box for box in boxes_detector.detect(frame) if box is not None]
+            detected_markers = aruco_detector.detect(frame)
+        else:
+            x0, y0, x1, y1 = region
+            crop = frame[y0:y1, x0:x1]
+            offset = np.array((x0, y0), dtype=np.float32)
+            detected_boxes = [box + offset for box in boxes_detector.detect(crop) if box is not None]
+            detected_markers = aruco_detector.detect(crop, (x0, y0), frame.shape)
+        boxes_filtered = CameraController.filter_by_overlap(detected_boxes,
+                                                            [m.bounding_box for m in detected_markers])
+        return boxes_filtered, detected_markers
 
-    def filter_by_overlap(self, source_list, remove_list, threshold=0.8):
+    @staticmethod
+    def filter_by_overlap(source_list, remove_list, threshold=0.8):
         filtered = []
         for src in source_list:
-            if not any(self.box_inside_area_ratio(rem, src) > threshold for rem in remove_list):
+            if not any(CameraController.box_inside_area_ratio(rem, src) > threshold for rem in remove_list):
                 filtered.append(src)
         return filtered
 
@@ -0,0 +1,157 @@
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from camera.RegionOfInterest import RegionOfInterest
+from camera.detectors.ArucoDetector import ArucoResult
+
+
+def _pack_boxes(boxes) -> np.ndarray:
+    if not boxes:
+        return np.zeros((0, 4, 2), dtype=np.float32)
+    return np.asarray(boxes, dtype=np.float32).reshape(-1, 4, 2)
+
+
+def _worker_main(conn, marker_real_size, aruco_dict, inference_size, detection_roi):
+    # Детекторы создаются уже в дочернем процессе: модель YOLO и torch в процесс интерфейса не загружаются
+    from camera.CameraController import CameraController
+    from camera.detectors.ArucoDetector import ArucoBoxDetector
+    from camera.detectors.YoloBoxDetector import YoloBoxDetector
+
+    boxes_detector = YoloBoxDetector(imgsz=inference_size)
+    aruco_detector = ArucoBoxDetector(marker_real_size, aruco_dict)
+    # Область живёт в процессе детекции: её пересчёт по маркерам идёт по полным кадрам отсюда
+    roi = None if detection_roi is None else RegionOfInterest(detection_roi)
+    memory = None
+    try:
+        while True:
+            request = conn.recv()
+            if request is None:
+                break
+            frame_id, name, shape, dtype = request
+
+            # Общий буфер пересоздаётся только при смене размера кадра
+            if memory is None or memory.name != name:
+                if memory is not None:
+                    memory.close()
+                memory = shared_memory.SharedMemory(name=name)
+            frame = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+            boxes, markers = CameraController.detect_frame(boxes_detector, aruco_detector, frame, roi)
+            del frame
+
+            # Обратно уходят только компактные массивы, без объектов детекторов
+            conn.send((frame_id,
+                       _pack_boxes(boxes),
+                       np.array([m.id for m in markers], dtype=np.int32),
+                       _pack_boxes([m.bounding_box for m in markers]),
+                       np.array([m.rvec for m in markers], dtype=np.float64).reshape(-1, 1, 3),
+                       np.array([m.tvec for m in markers], dtype=np.float64).reshape(-1, 1, 3)))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        if memory is not None:
+            memory.close()
+        conn.close()
+
+
+class DetectionWorker:
+    """
+    Детекция в отдельном процессе, чтобы инференс и постобработка на Python не делили GIL с окном pygame.
+    Кадр копируется в разделяемую память (одна копия без сериализации), по каналу уходят только
+    номер кадра и описание буфера, назад приходят массивы коробок и маркеров.
+    Запрос всегда один: следующий кадр пишется в буфер только после ответа на предыдущий.
+    """
+
+    # Как часто ждущий ответа поток проверяет, жив ли процесс детекции
+    POLL_INTERVAL = 0.5
+    STOP_TIMEOUT = 5
+
+    def __init__(self, marker_real_size, aruco_dict, inference_size: int | None = 640, detection_roi=None):
+        self.marker_real_size = marker_real_size
+        self.aruco_dict = aruco_dict
+        self.inference_size = inference_size
+        self.detection_roi = detection_roi
+
+        self._process = None
+        self._conn = None
+        self._memory: shared_memory.SharedMemory | None = None
+        self._shape = None
+        self._dtype = None
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        if self._process is not None:
+            return
+        # spawn, а не fork: дочерний процесс не должен наследовать потоки захвата и состояние pygame
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=_worker_main,
+                                        args=(child_conn, self.marker_real_size, self.aruco_dict,
+                                              self.inference_size, self.detection_roi),
+                                        daemon=True)
+        self._process.start()
+        child_conn.close()
+
+    def stop(self):
+        if self._process is None:
+            return
+        try:
+            self._conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self._process.join(self.STOP_TIMEOUT)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._conn.close()
+        self._process = None
+        self._conn = None
+        self._release_memory()
+
+    def detect(self, frame: np.ndarray, frame_id: int = 0) -> tuple[list, list[ArucoResult]]:
+        """
+        Блокирует вызывающий поток до ответа, но GIL на это время свободен.
+
+        :return: (отфильтрованные коробки (4, 2), маркеры), как у CameraController.detect_frame
+        """
+        if self._process is None:
+            raise RuntimeError("Процесс детекции не запущен")
+
+        self._ensure_memory(frame)
+        np.copyto(np.ndarray(self._shape, dtype=self._dtype, buffer=self._memory.buf), frame)
+        self._conn.send((frame_id, self._memory.name, self._shape, self._dtype.str))
+
+        try:
+            while not self._conn.poll(self.POLL_INTERVAL):
+                if not self._process.is_alive():
+                    raise EOFError
+            _, boxes, marker_ids, marker_boxes, rvecs, tvecs = self._conn.recv()
+        except EOFError:
+            self._process.join()
+            raise RuntimeError(f"Процесс детекции завершился с кодом {self._process.exitcode}")
+
+        markers = [ArucoResult(int(marker_ids[i]), marker_boxes[i], rvecs[i], tvecs[i])
+                   for i in range(len(marker_ids))]
+        return list(boxes), markers
+
+    def _ensure_memory(self, frame: np.ndarray):
+        if self._memory is not None and self._shape == frame.shape and self._dtype == frame.dtype:
+            return
+        self._release_memory()
+        self._memory = shared_memory.SharedMemory(create=True, size=max(frame.nbytes, 1))
+        self._shape = frame.shape
+        self._dtype = frame.dtype
+
+    def _release_memory(self):
+        if self._memory is None:
+            return
+        self._memory.close()
+        self._memory.unlink()
+        self._memory = None
+        self._shape = None
+        self._dtype = None
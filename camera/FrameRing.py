@@ -0,0 +1,127 @@
+import threading
+
+import numpy as np
+
+
+class FrameRef:
+    """
+    Закреплённый кадр из FrameRing: пока ссылка не отпущена, захват не пишет в её буфер.
+    Массив только для чтения; если кадр нужен дольше, его надо скопировать.
+    """
+
+    def __init__(self, ring: 'FrameRing', index: int, generation: int, array: np.ndarray):
+        self._ring = ring
+        self.index = index
+        self.generation = generation
+        self.array = array
+
+    @property
+    def valid(self) -> bool:
+        return self._ring.generation_of(self.index) == self.generation
+
+    def release(self):
+        if self._ring is not None:
+            self._ring._unpin(self.index)
+            self._ring = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class FrameRing:
+    """
+    Кольцо заранее выделенных буферов кадров: захват читает прямо в свободный буфер (cap.read(image=...)),
+    читатели получают виды только для чтения без копирования.
+    Буфер занят, пока его кадр последний или пока его держит хотя бы одна FrameRef (счётчик ссылок).
+    Поколение буфера меняется при каждой перезаписи, поэтому вид, оставшийся после release(), можно проверить
+    на свежесть (FrameRef.valid).
+    Если все буферы заняты, кольцо растёт, но не больше max_size: дальше запись ждёт, пока читатель
+    отпустит буфер, и незакрытые FrameRef не съедают память без предела.
+    """
+
+    MAX_SIZE = 8
+
+    def __init__(self, size: int = 4, max_size: int = MAX_SIZE):
+        self.max_size = max(max_size, size)
+        self._buffers: list[np.ndarray | None] = [None] * size
+        self._generations = [0] * size
+        self._pins = [0] * size
+        self._latest: int | None = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+
+    def write_buffer(self, timeout: float | None = None) -> tuple[int, np.ndarray | None] | None:
+        """
+        :param timeout: сколько ждать освобождения буфера, когда кольцо уже максимального размера
+        :return: (номер буфера, буфер для записи или None, если он ещё не выделен);
+                 None, если за timeout ни один буфер не освободился
+        """
+        with self._lock:
+            index = self._free_index()
+            if index is None and len(self._buffers) < self.max_size:
+                # Все буферы держат читатели — расширяем кольцо, а не ждём их
+                self._buffers.append(None)
+                self._generations.append(0)
+                self._pins.append(0)
+                index = len(self._buffers) - 1
+            elif index is None:
+                if not self._released.wait_for(lambda: self._free_index() is not None, timeout):
+                    return None
+                index = self._free_index()
+
+            # Старые незакреплённые виды этого буфера с этого момента считаются устаревшими
+            self._generations[index] = -1
+            return index, self._buffers[index]
+
+    def commit(self, index: int, frame: np.ndarray) -> int:
+        """
+        Публикует записанный кадр. Если чтение выделило новый массив (первый кадр или сменилось разрешение),
+        он становится буфером этого слота.
+
+        :return: поколение кадра, растёт монотонно
+        """
+        with self._lock:
+            self._buffers[index] = frame
+            self._generation += 1
+            self._generations[index] = self._generation
+            self._latest = index
+            return self._generation
+
+    def acquire(self) -> FrameRef | None:
+        """Закрепляет последний кадр; ссылку нужно отпустить через release() или with."""
+        with self._lock:
+            if self._latest is None:
+                return None
+            index = self._latest
+            self._pins[index] += 1
+            return FrameRef(self, index, self._generations[index], self._read_only(self._buffers[index]))
+
+    def generation_of(self, index: int) -> int:
+        with self._lock:
+            return self._generations[index]
+
+    def clear(self):
+        with self._lock:
+            self._latest = None
+
+    def _free_index(self) -> int | None:
+        for index in range(len(self._buffers)):
+            if index != self._latest and self._pins[index] == 0:
+                return index
+        return None
+
+    def _unpin(self, index: int):
+        with self._lock:
+            self._pins[index] -= 1
+            if self._pins[index] == 0:
+                self._released.notify_all()
+
+    @staticmethod
+    def _read_only(buffer: np.ndarray) -> np.ndarray:
+        view = buffer.view()
+        view.flags.writeable = False
+        return view
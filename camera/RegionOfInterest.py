@@ -0,0 +1,73 @@
+import numpy as np
+
+from camera.detectors.ArucoDetector import ArucoBoxDetector
+
+MARKERS = "markers"
+
+
+class RegionOfInterest:
+    """
+    Область кадра, в которой ищутся коробки: рабочая зона, заданная пользователем (x, y, w, h)
+    или охватывающая маркеры ArUco, расставленные по её краям.
+    Область по маркерам пересчитывается по полному кадру только раз в refresh_frames кадров
+    и выравнивается по сетке, чтобы дрожание маркеров не меняло размер выреза
+    (от него зависят буферы детектора).
+    """
+
+    REFRESH_FRAMES = 30
+    # Запас вокруг маркеров — доля размера охватывающего их прямоугольника
+    PADDING = 0.1
+    MIN_MARKERS = 2
+    GRID = 32
+
+    def __init__(self, source=MARKERS, refresh_frames=REFRESH_FRAMES, padding=PADDING):
+        """
+        :param source: "markers" — по маркерам ArUco; (x, y, w, h) — заданная область в пикселях кадра
+        """
+        self.source = source
+        self.refresh_frames = refresh_frames
+        self.padding = padding
+
+        self.region: tuple[int, int, int, int] | None = None
+        self._frames_left = 0
+
+    def reset(self):
+        self.region = None
+        self._frames_left = 0
+
+    def update(self, frame: np.ndarray, aruco_detector: ArucoBoxDetector) -> tuple[int, int, int, int] | None:
+        """
+        :return: (x0, y0, x1, y1) в пикселях кадра или None — искать во всём кадре
+        """
+        height, width = frame.shape[:2]
+        if self.source != MARKERS:
+            x, y, w, h = self.source
+            self.region = self._clip(x, y, x + w, y + h, width, height)
+            return self.region
+
+        if self._frames_left > 0:
+            self._frames_left -= 1
+            return self.region
+        self._frames_left = self.refresh_frames
+
+        markers = aruco_detector.detect(frame)
+        if len(markers) < self.MIN_MARKERS:
+            # Рабочую зону не видно — ищем во всём кадре до следующего пересчёта
+            self.region = None
+            return None
+
+        points = np.concatenate([np.asarray(m.bounding_box, dtype=np.float32).reshape(-1, 2) for m in markers])
+        (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+        pad_x, pad_y = (x1 - x0) * self.padding, (y1 - y0) * self.padding
+        self.region = self._clip(x0 - pad_x, y0 - pad_y, x1 + pad_x, y1 + pad_y, width, height)
+        return self.region
+
+    def _clip(self, x0, y0, x1, y1, width, height):
+        # Наружу до сетки: небольшой сдвиг маркеров не меняет размер выреза
+        x0, y0 = int(np.floor(x0 / self.GRID)) * self.GRID, int(np.floor(y0 / self.GRID)) * self.GRID
+        x1, y1 = int(np.ceil(x1 / self.GRID)) * self.GRID, int(np.ceil(y1 / self.GRID)) * self.GRID
+        x0, y0 = min(max(x0, 0), width), min(max(y0, 0), height)
+        x1, y1 = min(max(x1, 0), width), min(max(y1, 0), height)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return x0, y0, x1, y1
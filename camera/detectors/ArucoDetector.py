@@ -16,7 +16,11 @@ class ArucoBoxDetector:
         self.marker_real_size = marker_real_size
         self.parameters = cv2.aruco.DetectorParameters()
 
-    def detect(self, frame) -> list[ArucoResult]:
+    def detect(self, frame, offset=(0, 0), frame_shape=None) -> list[ArucoResult]:
+        """
+        :param offset: (x, y) левого верхнего угла frame в полном кадре, если передан вырез из него
+        :param frame_shape: форма полного кадра для параметров камеры; по умолчанию frame.shape
+        """
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
         corners, ids, _ = cv2.aruco.detectMarkers(gray, self.marker_dict, parameters=self.parameters)
@@ -25,7 +29,11 @@ class ArucoBoxDetector:
         if ids is None or len(corners) == 0:
             return results
 
-        camera_matrix, dist_coeffs = self._get_camera_calibration_params(frame.shape)
+        # Углы в координаты полного кадра до оценки позы: центр камеры задан относительно него
+        if offset != (0, 0):
+            corners = tuple(c + np.array(offset, dtype=c.dtype) for c in corners)
+        camera_matrix, dist_coeffs = self._get_camera_calibration_params(
+            frame.shape if frame_shape is None else frame_shape)
         rvecs, tvecs, _ = cv2.aruco.estimatePoseSingleMarkers(corners, self.marker_real_size,
                                                               camera_matrix, dist_coeffs)
 
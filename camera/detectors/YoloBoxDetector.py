@@ -1,20 +1,86 @@
+import math
+
 import cv2
 import numpy as np
 import torch
 from ultralytics import YOLO
 
 
+class Letterbox:
+    """
+    Вписывает кадр в квадрат size x size с сохранением пропорций и серыми полями, как при обучении YOLO.
+    Хранит параметры преобразования, чтобы переводить точки обратно в координаты кадра.
+    Холст выделяется один раз на размер кадра.
+    """
+
+    PAD_VALUE = 114
+
+    def __init__(self, frame_shape, size: int):
+        self.frame_height, self.frame_width = frame_shape[:2]
+        self.size = size
+
+        scale = min(size / self.frame_width, size / self.frame_height)
+        self.width = max(int(round(self.frame_width * scale)), 1)
+        self.height = max(int(round(self.frame_height * scale)), 1)
+        # После округления масштаб по осям немного различается, для точного обратного перевода храним оба
+        self.scale_x = self.width / self.frame_width
+        self.scale_y = self.height / self.frame_height
+        self.pad_x = (size - self.width) // 2
+        self.pad_y = (size - self.height) // 2
+
+        self._canvas = np.full((size, size) + tuple(frame_shape[2:]), self.PAD_VALUE, dtype=np.uint8)
+
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        """Кадр в холсте; массив переиспользуется следующим вызовом."""
+        cv2.resize(frame, (self.width, self.height),
+                   dst=self._canvas[self.pad_y:self.pad_y + self.height, self.pad_x:self.pad_x + self.width],
+                   interpolation=cv2.INTER_AREA)
+        return self._canvas
+
+    def to_frame_points(self, points: np.ndarray) -> np.ndarray:
+        """
+        Пиксельные координаты холста -> координаты кадра.
+        Центры пикселей переводятся так же, как их переводит cv2.resize: (x + 0.5) / scale - 0.5.
+        """
+        points = np.asarray(points, dtype=np.float32)
+        frame_points = np.empty_like(points)
+        frame_points[..., 0] = (points[..., 0] - self.pad_x + 0.5) / self.scale_x - 0.5
+        frame_points[..., 1] = (points[..., 1] - self.pad_y + 0.5) / self.scale_y - 0.5
+        return frame_points
+
+
 class YoloBoxDetector:
-    def __init__(self, model_path="FastSAM-s.pt", conf_threshold=0.6):
+    # Допустимые размеры входа: сторона должна делиться на шаг сети 32
+    INFERENCE_SIZES = (320, 480, 640)
+    STRIDE = 32
+
+    def __init__(self, model_path="FastSAM-s.pt", conf_threshold=0.6, imgsz: int | None = 640):
+        """
+        :param imgsz: сторона квадратного входа сети; None — как раньше, по ширине кадра без вписывания
+        """
+        if imgsz is not None and imgsz % self.STRIDE != 0:
+            raise ValueError(f"Размер входа должен делиться на {self.STRIDE}: {imgsz}")
         self.model = YOLO(model_path)
         self.conf_threshold = conf_threshold
+        self.imgsz = imgsz
+        self._letterbox: Letterbox | None = None
+
+    def letterbox_for(self, frame_shape) -> Letterbox | None:
+        if self.imgsz is None:
+            return None
+        letterbox = self._letterbox
+        if letterbox is None or (letterbox.frame_height, letterbox.frame_width) != tuple(frame_shape[:2]):
+            letterbox = self._letterbox = Letterbox(frame_shape, self.imgsz)
+        return letterbox
 
     def detect(self, frame):
+        letterbox = self.letterbox_for(frame.shape)
+        source = frame if letterbox is None else letterbox.apply(frame)
         results = self.model.predict(
-            source=frame,  # путь к изображению, видео, папке, rtsp, 0 (камера)
+            source=source,  # путь к изображению, видео, папке, rtsp, 0 (камера)
             conf=self.conf_threshold,  # порог уверенности (Confidence threshold)
             device='cpu',  # 'cpu', '0', '0,1' — номер GPU или 'cpu'
-            imgsz=frame.shape[1],  # размер входного изображения
+            imgsz=source.shape[1],  # размер входного изображения
             # iou=0.8,  # порог IoU для NMS (Non-Maximum Suppression)
             # classes=[0, 2],  # детектировать только определённые классы (по индексам)
             # save=True,  # сохранить результат в файл
@@ -30,42 +96,72 @@ class YoloBoxDetector:
             return boxes
 
         result = results[0]
-        img = frame.copy()
 
         if result.masks is None or result.masks.data is None or result.masks.data.shape[0] > 50:
             print("ret")
             return boxes
 
         masks = result.masks.data.cpu().numpy()  # (N, H, W)
-        masks  = self.remove_inner_masks(masks)
-        num_masks = masks.shape[0]
+        # Порог площади задан в пикселях кадра, маски же в пикселях входа сети
+        scale = 1.0 if letterbox is None else letterbox.scale_x * letterbox.scale_y
+        masks = self.remove_inner_masks(masks, min_area=100 * scale)
+
+        for mask in masks:
+            if letterbox is None:
+                if mask.shape != frame.shape[:2]:
+                    mask = cv2.resize(mask, (frame.shape[1], frame.shape[0]), interpolation=cv2.INTER_NEAREST)
+                boxes.append(self.get_rotated_bbox_from_mask(mask))
+                continue
 
-        colors = [(255, 0, 0) for _ in range(num_masks)]
+            # Контур ищем на маленькой маске и переводим в кадр точками, а не растягиванием маски
+            if mask.shape != (letterbox.size, letterbox.size):
+                mask = cv2.resize(mask, (letterbox.size, letterbox.size), interpolation=cv2.INTER_NEAREST)
+            contour = self.get_largest_contour(mask)
+            if contour is None:
+                boxes.append(None)
+                continue
+            # Углы прямоугольника по краям пикселей маски, а не по центрам: иначе коробка выходит меньше
+            # на пиксель входа сети, то есть на несколько пикселей кадра
+            corners = cv2.boxPoints(self.pixel_edge_rect(contour))
+            rect = cv2.minAreaRect(letterbox.to_frame_points(corners))
+            boxes.append(cv2.boxPoints(rect))
+        return boxes
+
+    def get_largest_contour(self, mask):
+        contours, _ = cv2.findContours(mask.astype(np.uint8), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return None
+        return max(contours, key=cv2.contourArea)
 
-        for i in range(num_masks):
-            mask = masks[i]
-            color = colors[i]
+    @staticmethod
+    def pixel_edge_rect(contour):
+        """
+        minAreaRect контура, расширенный от центров крайних пикселей маски до границы коробки.
+        У стороны вдоль сетки граница лежит на полпикселя дальше центров, у наклонной центры подходят к ней
+        почти вплотную. Поэтому отступ d (0..0.5 с каждой стороны) подбирается так, чтобы площадь
+        прямоугольника совпала с числом пикселей внутри контура: (w + 2d)(h + 2d) = площадь.
 
-            if mask.shape != img.shape[:2]:
-                mask = cv2.resize(mask, (img.shape[1], img.shape[0]), interpolation=cv2.INTER_NEAREST)
+        :return: ((cx, cy), (w, h), angle), как у cv2.minAreaRect
+        """
+        center, (w, h), angle = cv2.minAreaRect(contour)
 
-            colored_mask = np.zeros_like(img, dtype=np.uint8)
-            for c in range(3):
-                colored_mask[:, :, c] = mask * color[c]
+        x, y, bw, bh = cv2.boundingRect(contour)
+        filled = np.zeros((bh, bw), dtype=np.uint8)
+        cv2.drawContours(filled, [contour], -1, 1, cv2.FILLED, offset=(-x, -y))
+        area = cv2.countNonZero(filled)
 
-            boxes.append(self.get_rotated_bbox_from_mask(mask))
-        return boxes
+        d = (math.sqrt(max((w + h) ** 2 - 4 * (w * h - area), 0)) - (w + h)) / 4
+        d = min(max(d, 0.0), 0.5)
+        return center, (w + 2 * d, h + 2 * d), angle
 
     def get_rotated_bbox_from_mask(self, mask):
-        contours, _ = cv2.findContours(mask.astype(np.uint8), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if not contours:
+        cnt = self.get_largest_contour(mask)
+        if cnt is None:
             return None
 
-        cnt = max(contours, key=cv2.contourArea)
         rect = cv2.minAreaRect(cnt)
         return cv2.boxPoints(rect)  # ((cx, cy), (w, h), angle)
 
-
     def remove_inner_masks(self, masks, iou_thresh=0.9, min_area=100):
         """
         Удаляет маски, вложенные в более крупные, и возвращает отфильтрованные маски.
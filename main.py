@@ -1,5 +1,5 @@
-from app.App import app_instance
-
-app_instance.run()
-
+if __name__ == '__main__':
+    # Защита нужна для процессов, запускаемых через spawn (общий пул, детекция): они импортируют main заново
+    from app.App import app_instance
 
+    app_instance.run()
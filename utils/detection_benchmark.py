@@ -0,0 +1,128 @@
+"""
+Задержка и точность детекции коробок при разных размерах входа сети.
+
+Запуск из корня репозитория:
+    python -m utils.detection_benchmark
+    python -m utils.detection_benchmark --sizes 320 480 640 --images in/test.jpg --report out/detection_report.json
+
+Эталон для каждого изображения — детекция во всю ширину кадра (imgsz=None, как было до вписывания).
+Для каждого размера пишет медианное время detect, число коробок, полноту и точность относительно эталона
+(совпадение — IoU повёрнутых прямоугольников не ниже --iou) и средний IoU совпавших пар.
+"""
+import argparse
+import glob
+import json
+import platform
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from camera.detectors.YoloBoxDetector import YoloBoxDetector
+
+DEFAULT_IMAGES = "in/*"
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def box_iou(a, b) -> float:
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    inter, _ = cv2.intersectConvexConvex(a, b)
+    union = cv2.contourArea(a) + cv2.contourArea(b) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def match_boxes(boxes, reference, threshold):
+    """Жадное сопоставление по убыванию IoU; возвращает IoU совпавших пар."""
+    pairs = sorted(((box_iou(box, ref), i, j) for i, box in enumerate(boxes) for j, ref in enumerate(reference)),
+                   reverse=True)
+    used_boxes, used_refs, ious = set(), set(), []
+    for iou, i, j in pairs:
+        if iou < threshold:
+            break
+        if i in used_boxes or j in used_refs:
+            continue
+        used_boxes.add(i)
+        used_refs.add(j)
+        ious.append(iou)
+    return ious
+
+
+def measure(detector, frame, repeats):
+    detector.detect(frame)  # прогрев: первый вызов включает инициализацию модели
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        boxes = detector.detect(frame)
+        times.append(time.perf_counter() - start)
+    return [box for box in boxes if box is not None], float(np.median(times))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк размера входа детектора коробок")
+    parser.add_argument("--images", nargs="+", default=[DEFAULT_IMAGES], help="файлы или маски файлов")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(YoloBoxDetector.INFERENCE_SIZES))
+    parser.add_argument("--model", default="FastSAM-s.pt")
+    parser.add_argument("--conf", type=float, default=0.6)
+    parser.add_argument("--iou", type=float, default=0.5, help="порог IoU для совпадения с эталоном")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--report", help="куда сохранить отчёт JSON")
+    args = parser.parse_args(argv)
+
+    paths = sorted(p for pattern in args.images for p in glob.glob(pattern) if p.lower().endswith(IMAGE_EXTENSIONS))
+    if not paths:
+        parser.error("не найдено ни одного изображения")
+
+    reference_detector = YoloBoxDetector(args.model, args.conf, imgsz=None)
+    detectors = {size: YoloBoxDetector(args.model, args.conf, imgsz=size) for size in args.sizes}
+
+    results = []
+    for path in paths:
+        frame = cv2.imread(path)
+        if frame is None:
+            print(f"Не удалось прочитать {path}, пропускаю")
+            continue
+
+        reference, reference_time = measure(reference_detector, frame, args.repeats)
+        results.append({"image": path, "size": None, "time_s": reference_time, "boxes": len(reference),
+                        "recall": 1.0, "precision": 1.0, "mean_iou": 1.0})
+        print(f"{path}: {frame.shape[1]}x{frame.shape[0]}, эталон {len(reference)} коробок, "
+              f"{reference_time * 1000:.1f} ms")
+
+        for size, detector in detectors.items():
+            boxes, elapsed = measure(detector, frame, args.repeats)
+            ious = match_boxes(boxes, reference, args.iou)
+            result = {
+                "image": path,
+                "size": size,
+                "time_s": elapsed,
+                "boxes": len(boxes),
+                "recall": len(ious) / len(reference) if reference else 1.0,
+                "precision": len(ious) / len(boxes) if boxes else 1.0,
+                "mean_iou": float(np.mean(ious)) if ious else 0.0,
+            }
+            results.append(result)
+            print(f"{size:>6}: {elapsed * 1000:9.1f} ms (x{reference_time / elapsed:.1f}), "
+                  f"коробок {len(boxes)}, полнота {result['recall']:.2f}, точность {result['precision']:.2f}, "
+                  f"IoU {result['mean_iou']:.3f}")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "model": args.model,
+            "conf": args.conf,
+            "iou": args.iou,
+            "repeats": args.repeats,
+        },
+        "results": results,
+    }
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+Бенчмарк упаковщиков на воспроизводимых наборах коробок.
+
+Запуск из корня репозитория:
+    python -m utils.packer_benchmark --counts 10 100 1000 --report out/packer_report.json
+    python -m utils.packer_benchmark --recorded out/recorded_sizes.json --baseline out/packer_baseline.json
+    python -m utils.packer_benchmark --update-baseline
+
+Для каждого (упаковщик, распределение, число коробок) пишет время, пиковую память и заполненность.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.common.ItemGenerator import DISTRIBUTIONS, generate_sizes, load_recorded_sizes
+from app.packers.MultiBinPacker import MultiBinPacker
+from app.packers.NFDHPacker import NFDHPacker
+from app.packers.PackerBase import ITEM_DTYPE
+from app.packers.Packers import ENGINES
+
+DEFAULT_BASELINE = "out/packer_baseline.json"
+DEFAULT_COUNTS = [10, 100, 1000, 10000, 100000]
+# Движки, которые на больших наборах считаются слишком долго, ограничиваем по числу коробок
+MAX_COUNTS = {"MaxRects": 10000, "Guillotine": 10000}
+
+# Порог регрессии относительно базовой линии
+TIME_REGRESSION = 1.2
+FILL_REGRESSION = 0.01
+
+
+def make_instance(count, distribution, seed, recorded=None):
+    rng = np.random.default_rng([seed, count, DISTRIBUTIONS.index(distribution)])
+    sizes = generate_sizes(count, distribution, rng, recorded)
+
+    items = np.zeros(count, dtype=ITEM_DTYPE)
+    items['id'] = np.arange(count)
+    items['w'] = sizes[:, 0]
+    items['h'] = sizes[:, 1]
+    return items
+
+
+def make_runners(bin_width, bin_height, allow_rotation, multi_bin):
+    """Имя -> функция(items) -> (число уложенных, заполненность, число ящиков)."""
+    bin_area = bin_width * bin_height
+    runners = {}
+
+    for name, engine in ENGINES.items():
+        if multi_bin:
+            def run(items, engine=engine):
+                bins = MultiBinPacker(bin_width, bin_height, allow_rotation, engine).place_bins(_as_tuples(items))
+                area = sum(p[3] * p[4] for placements in bins for p in placements)
+                return sum(len(p) for p in bins), area / (bin_area * max(len(bins), 1)), len(bins)
+        else:
+            def run(items, engine=engine):
+                placements = engine(bin_width, bin_height, allow_rotation).place(_as_tuples(items))
+                return len(placements), sum(p[3] * p[4] for p in placements) / bin_area, 1
+        runners[name] = run
+
+    if not multi_bin:
+        def run_batch(items):
+            placements = NFDHPacker(bin_width, bin_height, allow_rotation).pack_array(items)
+            area = int((placements['w'].astype(np.int64) * placements['h']).sum())
+            return len(placements), area / bin_area, 1
+        runners["NFDH-batch"] = run_batch
+
+    return runners
+
+
+def _as_tuples(items):
+    return list(zip(items['id'].tolist(), items['w'].tolist(), items['h'].tolist()))
+
+
+def measure(run, items, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        placed, fill, bins = run(items)
+        times.append(time.perf_counter() - start)
+
+    # Память меряем отдельным прогоном: tracemalloc заметно замедляет Python-код
+    tracemalloc.start()
+    run(items)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"time_s": min(times), "peak_mem_bytes": peak, "placed": placed, "fill_ratio": fill, "bins": bins}
+
+
+def compare(results, baseline):
+    """Сравнение с базовой линией; возвращает список регрессий."""
+    by_key = {(r["packer"], r["distribution"], r["count"]): r for r in baseline.get("results", [])}
+    regressions = []
+
+    for result in results:
+        key = (result["packer"], result["distribution"], result["count"])
+        base = by_key.get(key)
+        if base is None:
+            continue
+
+        time_ratio = result["time_s"] / base["time_s"] if base["time_s"] > 0 else 1.0
+        fill_delta = result["fill_ratio"] - base["fill_ratio"]
+        result["baseline"] = {"time_ratio": time_ratio, "fill_delta": fill_delta}
+
+        if time_ratio > TIME_REGRESSION or fill_delta < -FILL_REGRESSION:
+            regressions.append(result)
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк упаковщиков")
+    parser.add_argument("--counts", type=int, nargs="+", default=DEFAULT_COUNTS)
+    parser.add_argument("--distributions", nargs="+", default=["uniform", "skewed"],
+                        choices=DISTRIBUTIONS)
+    parser.add_argument("--recorded", help="JSON со списком [w, h], записанный через AppConfig.sizes_record_path")
+    parser.add_argument("--packers", nargs="+", help="по умолчанию — все движки")
+    parser.add_argument("--bin", type=int, nargs=2, default=(330, 495), metavar=("W", "H"))
+    parser.add_argument("--rotation", action="store_true")
+    parser.add_argument("--multi-bin", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--report", help="куда сохранить отчёт JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="сохранить результаты как базовую линию")
+    args = parser.parse_args(argv)
+
+    recorded = None
+    distributions = list(args.distributions)
+    if args.recorded:
+        recorded = load_recorded_sizes(args.recorded)
+        if "recorded" not in distributions:
+            distributions.append("recorded")
+    elif "recorded" in distributions:
+        parser.error("для распределения 'recorded' нужен --recorded")
+
+    bin_width, bin_height = args.bin
+    runners = make_runners(bin_width, bin_height, args.rotation, args.multi_bin)
+    names = args.packers or list(runners)
+
+    results = []
+    for distribution in distributions:
+        for count in args.counts:
+            items = make_instance(count, distribution, args.seed, recorded)
+            for name in names:
+                if count > MAX_COUNTS.get(name, count):
+                    continue
+                result = {"packer": name, "distribution": distribution, "count": count,
+                          **measure(runners[name], items, args.repeats)}
+                results.append(result)
+                print(f"{name:>12} {distribution:>8} {count:>7}: {result['time_s'] * 1000:9.2f} ms, "
+                      f"{result['peak_mem_bytes'] / 1024:9.1f} KiB, fill {result['fill_ratio']:.3f}, "
+                      f"placed {result['placed']}, bins {result['bins']}")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "bin": [bin_width, bin_height],
+            "rotation": args.rotation,
+            "multi_bin": args.multi_bin,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    regressions = []
+    if not args.update_baseline and not os.path.exists(args.baseline):
+        # Время зависит от машины, поэтому базовая линия не хранится в репозитории: её снимают на месте
+        print(f"Внимание: базовая линия {args.baseline} не найдена, сравнение пропущено. "
+              f"Создайте её запуском с --update-baseline", file=sys.stderr)
+    elif not args.update_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        settings = ("bin", "rotation", "multi_bin", "seed")
+        if any(baseline["meta"].get(k) != report["meta"][k] for k in settings):
+            print(f"Базовая линия {args.baseline} снята с другими настройками, сравнение пропущено")
+        else:
+            regressions = compare(results, baseline)
+            if not regressions:
+                print("Регрессий относительно базовой линии нет")
+        for r in regressions:
+            print(f"Регрессия: {r['packer']} {r['distribution']} {r['count']}: "
+                  f"время x{r['baseline']['time_ratio']:.2f}, заполненность {r['baseline']['fill_delta']:+.3f}")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Базовая линия сохранена в {args.baseline}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())